@@ -0,0 +1,146 @@
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from output_sinks import split_phones
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ----------------------
+# CONFIG
+# ----------------------
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "ndjson")   # "ndjson" or "csv"
+LOG_FORMATS = ("ndjson", "csv")
+LOG_COMPRESS = True     # every ZIP's rows become their own gzip member, so one ZIP can still be read on its own
+LOG_NAME = "_dealers"   # USA/<ST>/_dealers.ndjson.gz + USA/<ST>/_dealers.idx (underscore: not a per-ZIP CSV)
+LOG_CSV_HEADER = ["zip", "Business Name", "Phone(s)", "Address", "scraped_at"]   # also the keys of every decoded row
+
+class StateLog:
+    """One append-only dealer file per state plus a sidecar index of where each ZIP's rows start.
+
+    Each append() writes one ZIP's rows as a single block and then an index line
+    "zip<TAB>offset<TAB>length<TAB>records<TAB>at". A re-scraped ZIP gets a new block and a newer
+    index line (the last one wins), so nothing is rewritten. Appends from threads and shard
+    processes are serialized with a lock on the index file; the index only ever points at
+    complete blocks, so a crash mid-write leaves unreferenced bytes and nothing else.
+    """
+
+    def __init__(self, folder_path, fmt=LOG_FORMAT, compress=LOG_COMPRESS):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {fmt!r} (expected one of {LOG_FORMATS})")
+        self.folder_path = folder_path
+        self.fmt = fmt
+        self.compress = compress
+        self.path = os.path.join(folder_path, f"{LOG_NAME}.{fmt}{'.gz' if compress else ''}")
+        self.index_path = os.path.join(folder_path, f"{LOG_NAME}.idx")
+        self._lock = threading.Lock()
+
+    def _encode(self, zip_code, dealers, scraped_at):
+        if self.fmt == "ndjson":
+            text = "".join(json.dumps({"zip": zip_code, "business_name": name, "phones": split_phones(phones),
+                                       "address": address, "scraped_at": scraped_at}, ensure_ascii=False) + "\n"
+                           for name, phones, address in dealers)
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="\n").writerows(
+                [zip_code, name, phones, address, scraped_at] for name, phones, address in dealers)
+            text = buffer.getvalue()
+        data = text.encode("utf-8")
+        return gzip.compress(data, compresslevel=6, mtime=0) if self.compress else data
+
+    def append(self, results):
+        """Append [(zip, dealer rows)]: one block per ZIP, then their index lines."""
+        os.makedirs(self.folder_path, exist_ok=True)
+        scraped_at = int(time.time())
+        blocks = [(zip_code, len(dealers), self._encode(zip_code, dealers, scraped_at)) for zip_code, dealers in results]
+        with self._lock, open(self.index_path, "a+", encoding="utf-8") as index, _FileLock(index):
+            with open(self.path, "ab") as log:
+                offset = log.seek(0, os.SEEK_END)
+                if offset == 0 and self.fmt == "csv":
+                    header = ",".join(LOG_CSV_HEADER).encode("utf-8") + b"\n"
+                    offset += log.write(gzip.compress(header, mtime=0) if self.compress else header)
+                lines = []
+                for zip_code, records, block in blocks:
+                    log.write(block)
+                    lines.append(f"{zip_code}\t{offset}\t{len(block)}\t{records}\t{scraped_at}\n")
+                    offset += len(block)
+                log.flush()
+                os.fsync(log.fileno())  # blocks are on disk before the index points at them
+            index.write("".join(lines))
+            index.flush()
+
+    def load_index(self):
+        """{zip: (offset, length, records)} of every ZIP in the log (latest block per ZIP)."""
+        index = {}
+        if not os.path.exists(self.index_path):
+            return index
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 4:
+                    continue  # torn last line after a crash
+                index[parts[0]] = (int(parts[1]), int(parts[2]), int(parts[3]))
+        return index
+
+    def _decode(self, data):
+        """Rows as dicts keyed by LOG_CSV_HEADER (write_csv's columns plus zip and scraped_at) in either format."""
+        text = (gzip.decompress(data) if self.compress else data).decode("utf-8")
+        if self.fmt == "ndjson":
+            records = (json.loads(line) for line in text.splitlines() if line)
+            values = ([r["zip"], r["business_name"], "; ".join(r["phones"]) or "N/A", r["address"], r["scraped_at"]]
+                      for r in records)
+        else:
+            values = ([zip_code, name, phones, address, int(scraped_at)]
+                      for zip_code, name, phones, address, scraped_at in csv.reader(io.StringIO(text)))
+        return [dict(zip(LOG_CSV_HEADER, row)) for row in values]
+
+    def read_zip(self, zip_code, index=None):
+        """The latest rows stored for one ZIP (a seek plus one block read), or None if it isn't in the log."""
+        entry = (index if index is not None else self.load_index()).get(zip_code)
+        if entry is None:
+            return None
+        offset, length, _ = entry
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return self._decode(f.read(length))
+
+    def iter_latest(self):
+        """Yield (zip, rows) for every ZIP in the log, reading only each ZIP's latest block."""
+        index = self.load_index()
+        with open(self.path, "rb") as f:
+            for zip_code, (offset, length, _) in sorted(index.items(), key=lambda item: item[1][0]):
+                f.seek(offset)
+                yield zip_code, self._decode(f.read(length))
+
+class _FileLock:
+    """Exclusive OS lock on an open file for the length of a with block (waits until it is free)."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+        else:
+            self.f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after 10 s; keep waiting
+        return self.f
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+        else:
+            self.f.seek(0)
+            msvcrt.locking(self.f.fileno(), msvcrt.LK_UNLCK, 1)
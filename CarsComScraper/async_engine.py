@@ -0,0 +1,149 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import httpx
+from dealer_cards import parse_search_page, extra_pages, merge_pages, search_url, PAGE_SIZE, MAX_PAGES
+from fetch_backend import USER_AGENT, HTTP_TIMEOUT
+from page_cache import get_page_cache, CacheMiss
+from rate_limiter import wait_for_slot_async
+from retry_policy import classify, is_retryable, backoff
+
+# ----------------------
+# CONFIG
+# ----------------------
+ASYNC_CONCURRENCY = 1000  # max in-flight HTTP requests
+PARSE_PROCESSES = 4       # HTML parsing happens in this many processes (0 → a thread pool instead)
+FALLBACK_THREADS = 8      # threads (one browser each) for ZIPs that need the Selenium fallback
+
+async def _fetch_page(zip_code, page, client, semaphore, parse_pool, fresh=False):
+    loop = asyncio.get_running_loop()
+    cache = get_page_cache()
+    url = search_url(zip_code, page)
+    html = None
+    if not fresh or cache.offline:
+        html = await loop.run_in_executor(None, cache.get, url)  # SQLite + gunzip stay off the event loop
+    if html is None:
+        if cache.offline:
+            raise CacheMiss(f"not in cache: {url}")
+        await wait_for_slot_async(url)
+        async with semaphore:
+            response = await client.get(url)
+            response.raise_for_status()
+        html = response.text
+        rows, total = await loop.run_in_executor(parse_pool, parse_search_page, html)
+        if rows:  # a card-less body goes to the browser fallback, which caches its own rendered copy
+            await loop.run_in_executor(None, cache.put, url, html)
+        return rows, total
+    return await loop.run_in_executor(parse_pool, parse_search_page, html)
+
+async def _fetch_all_pages(zip_code, client, semaphore, parse_pool, fresh=False):
+    """Page 1, then the rest of a dense ZIP's pages concurrently; returns (rows, pages fetched).
+
+    The async twin of dealer_cards.paginate: the same extra_pages() rule picks what follows page 1.
+    """
+    rows, total = await _fetch_page(zip_code, 1, client, semaphore, parse_pool, fresh)
+    pages = [rows]
+    extra = extra_pages(rows, total)
+    if extra:
+        fetched = await asyncio.gather(*(
+            _fetch_page(zip_code, page, client, semaphore, parse_pool, fresh) for page in extra
+        ))
+        pages.extend(page_rows for page_rows, _ in fetched)
+    elif extra is None:  # full page with no usable total: walk until a short page
+        for page in range(2, MAX_PAGES + 1):
+            rows, _ = await _fetch_page(zip_code, page, client, semaphore, parse_pool, fresh)
+            if not rows:
+                break
+            pages.append(rows)
+            if len(rows) < PAGE_SIZE:
+                break
+    return merge_pages(pages), len(pages)
+
+async def _scrape_one(zip_code, client, semaphore, parse_pool, fallback, fallback_pool, result_pool, max_retries,
+                      on_result, breaker, fresh):
+    loop = asyncio.get_running_loop()
+    start_time = time.time()
+    for attempt in range(1, max_retries + 1):
+        if breaker is not None:
+            await breaker.wait_async()
+        try:
+            dealers, backend, ready_sec, pages = [], "http", None, 0
+            try:
+                request_start = time.time()
+                dealers, pages = await _fetch_all_pages(zip_code, client, semaphore, parse_pool, fresh)
+                ready_sec = round(time.time() - request_start, 2)
+            except Exception:
+                if fallback is None:
+                    raise
+
+            if not dealers and fallback is not None:
+                result = await loop.run_in_executor(fallback_pool, fallback.fetch_dealers, zip_code, fresh)
+                dealers, backend, ready_sec, pages = result["dealers"], result["backend"], result["ready_sec"], result["pages"]
+
+            if breaker is not None:
+                breaker.record(True)
+            # on_result may block on a full writer queue, so it runs off the loop (one thread keeps the old ordering)
+            await loop.run_in_executor(result_pool, on_result, zip_code, dealers, {
+                "zip": zip_code,
+                "records": len(dealers),
+                "time_sec": round(time.time() - start_time, 2),
+                "ready_sec": ready_sec,
+                "backend": backend,
+                "pages": pages,
+                "status": "success",
+                "attempts": attempt
+            })
+            return
+        except Exception as e:
+            kind = classify(e)
+            if breaker is not None:
+                breaker.record(False)
+            if attempt == max_retries or not is_retryable(kind):
+                await loop.run_in_executor(result_pool, on_result, zip_code, None, {
+                    "zip": zip_code,
+                    "records": 0,
+                    "time_sec": round(time.time() - start_time, 2),
+                    "status": f"failed ({kind}: {e})",
+                    "attempts": attempt
+                })
+                return
+            await asyncio.sleep(backoff(kind, attempt))  # other ZIPs keep going meanwhile
+
+async def _run(zip_codes, on_result, fallback, concurrency, max_retries, parse_processes, fallback_threads, breaker,
+               fresh_zips):
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+    parse_pool = ProcessPoolExecutor(max_workers=parse_processes) if parse_processes else ThreadPoolExecutor()
+    fallback_pool = ThreadPoolExecutor(max_workers=fallback_threads)
+    result_pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        async with httpx.AsyncClient(limits=limits, headers=headers, timeout=HTTP_TIMEOUT, follow_redirects=True) as client:
+            await asyncio.gather(*(
+                _scrape_one(z, client, semaphore, parse_pool, fallback, fallback_pool, result_pool, max_retries,
+                            on_result, breaker, z in fresh_zips)
+                for z in zip_codes
+            ))
+    finally:
+        parse_pool.shutdown()
+        fallback_pool.shutdown()
+        result_pool.shutdown()
+
+def run_zip_queue_async(zip_codes, on_result, fallback=None, concurrency=ASYNC_CONCURRENCY, max_retries=3,
+                        parse_processes=PARSE_PROCESSES, fallback_threads=FALLBACK_THREADS, breaker=None,
+                        fresh_zips=()):
+    """Scrape every ZIP over HTTP on one event loop.
+
+    on_result(zip_code, dealers, row) is called once per ZIP on a single result thread (so a writer
+    applying backpressure never stalls the event loop); dealers is None when
+    the ZIP failed after max_retries. ZIPs whose page has no dealer cards (or fails over HTTP) go to
+    fallback.fetch_dealers() in a thread pool when a fallback backend is given. Failed attempts back off
+    per retry_policy; a CircuitBreaker, if given, pauses every ZIP while it is open. ZIPs in fresh_zips
+    skip the page cache.
+    """
+    asyncio.run(_run(zip_codes, on_result, fallback, concurrency, max_retries, parse_processes, fallback_threads,
+                     breaker, set(fresh_zips)))
@@ -0,0 +1,77 @@
+import threading
+import time
+from queue import Queue, Empty
+
+# ----------------------
+# CONFIG
+# ----------------------
+BATCH_SIZE = 8          # items per write
+FLUSH_INTERVAL = 5.0    # seconds a partial batch may wait before it is written anyway
+MAX_PENDING = 500       # queued items before put() blocks (backpressure when the disk falls behind)
+
+_STOP = object()
+
+class BatchWriter:
+    """Background thread that hands queued items to write_batch(items) in batches.
+
+    A batch is written once it has batch_size items or its oldest item has waited flush_interval
+    seconds. put() only blocks when max_pending items are already waiting, so producers never do
+    I/O themselves. A failed write is printed and the writer carries on with the next batch.
+    """
+
+    def __init__(self, write_batch, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING,
+                 name="batch-writer"):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.blocked_sec = 0.0   # total time producers waited on a full queue
+        self._queue = Queue(maxsize=max_pending)
+        self._blocked_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item):
+        start = time.time()
+        self._queue.put(item)
+        waited = time.time() - start
+        if waited > 0.01:
+            with self._blocked_lock:
+                self.blocked_sec += waited
+
+    def close(self):
+        """Write whatever is still queued and stop the thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.time()) if batch else None)
+            except Empty:
+                item = None  # the partial batch has waited long enough
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                if not batch:
+                    deadline = time.time() + self.flush_interval
+                batch.append(item)
+            if len(batch) >= self.batch_size or (batch and time.time() >= deadline):
+                self._flush(batch)
+                batch = []
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"❌ Writer failed on a batch of {len(batch)}: {e}")
+        self.batches += 1
+        self.items += len(batch)
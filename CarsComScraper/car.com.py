@@ -1400,61 +1400,36 @@ AR= [
     "72998"
   ]
 
-import time
 import csv
 import os
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from tqdm import tqdm   # progress bar
+from page_ready import wait_for_results
+from request_filter import apply_blocking_prefs, enable_request_blocking
+from dealer_cards import parse_dealer_cards
+from rate_limiter import wait_for_slot
 
 # Initialize Chrome browser
 def get_driver():
     options = webdriver.ChromeOptions()
+    apply_blocking_prefs(options)  # no images, fonts, CSS, media or trackers
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
     driver.maximize_window()
+    enable_request_blocking(driver)
     return driver
 
 def scrape_dealers(zip_code):
     url = f"https://www.cars.com/dealers/buy/?page=1&page_size=200&zip={zip_code}"
     driver = get_driver()
+    wait_for_slot(url)
     driver.get(url)
-    time.sleep(6)  # wait for page to load fully
+    ready_state, ready_sec = wait_for_results(driver)  # returns as soon as cards or the empty marker show up
 
-    all_dealers = []
-
-    # Get all dealer cards
-    dealers = driver.find_elements(By.CSS_SELECTOR, "div.sds-container.dealer-card")
-    print(f"[{zip_code}] Found {len(dealers)} dealers on this page")
-
-    # Loop with progress bar
-    for dealer in tqdm(dealers, desc=f"Scraping ZIP {zip_code}", unit="dealer"):
-        # Business Name
-        try:
-            name = dealer.find_element(By.CSS_SELECTOR, "h2.dealer-heading").text.strip()
-        except:
-            name = "N/A"
-
-        # Address
-        try:
-            address = dealer.find_element(By.CSS_SELECTOR, "div.dealer-address a.sds-link--ext").text.strip()
-        except:
-            address = "N/A"
-
-        # Phones
-        phones = []
-        try:
-            phone_elements = dealer.find_elements(By.CSS_SELECTOR, "a.phone-number, .desktop-phone-number")
-            for p in phone_elements:
-                ph = p.text.strip()
-                if ph and ph not in phones:
-                    phones.append(ph)
-        except:
-            pass
-
-        phone_str = "; ".join(phones) if phones else "N/A"
-        all_dealers.append([name, phone_str, address])
+    # Parse all dealer cards offline from one page_source read
+    all_dealers = parse_dealer_cards(driver.page_source)
+    print(f"[{zip_code}] Found {len(all_dealers)} dealers on this page (ready: {ready_state} in {ready_sec}s)")
 
     driver.quit()
 
@@ -1468,7 +1443,7 @@ def scrape_dealers(zip_code):
         writer = csv.writer(f)
         if not file_exists:
             writer.writerow(["Business Name", "Phone(s)", "Address"])
-        writer.writerows(all_dealers)
+        writer.writerows(tqdm(all_dealers, desc=f"Scraping ZIP {zip_code}", unit="dealer"))
 
     print(f"✅ Saved {len(all_dealers)} records to {output_file}\n")
 
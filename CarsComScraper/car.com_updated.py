@@ -1,22 +1,58 @@
 import time
-import csv
 import os
 import threading
 import json
 from queue import Queue
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from tqdm import tqdm
-from datetime import datetime
+from driver_pool import get_chromedriver_path
+from request_filter import apply_blocking_prefs, enable_request_blocking
+from tab_backend import apply_tab_options
+from fetch_backend import build_backend, browser_fallback
+from async_engine import run_zip_queue_async
+from process_shards import run_shards, QueueProgress
+from scrape_report import write_state_report, write_concurrency_log
+from zip_bisect import BisectScheduler
+from dealer_cards import dealer_fingerprint
+from result_manifest import ResultManifest, zip_from_csv_name
+from concurrency import AIMDController
+from retry_policy import RetryQueue, CircuitBreaker, classify, is_retryable, backoff
+from refresh_scheduler import pick_refresh, summarize as summarize_refresh
+from page_cache import get_page_cache
+from yield_priority import order_by_yield
+from crawl_journal import get_journal
+from batch_writer import BatchWriter
+from output_sinks import parse_sinks, write_csv, ParquetSink, RecentResults
+from dealer_store import DealerStore
+from append_log import StateLog
 
 # ----------------------
 # CONFIG
 # ----------------------
-THREAD_COUNT = 8  # concurrent threads
+THREAD_COUNT = 8  # concurrent threads to start with
+ADAPTIVE_WORKERS = True  # AIMD: add a worker while healthy, halve them on errors / slow p95 (see concurrency.py)
+MAX_THREADS = 32         # ceiling for the adaptive worker count
 MAX_RETRIES = 3   # retry attempts per ZIP
-BATCH_SIZE = 8    # write 6 CSVs at once
+BATCH_SIZE = 8    # write 8 CSVs at once (on a writer thread, see batch_writer.py)
+USE_DRIVER_POOL = True  # reuse pooled browsers (at most one per worker slot) instead of a new Chrome per ZIP
+BLOCK_ASSETS = True     # block images, fonts, CSS, media and trackers (lists in request_filter.py)
+USE_TABS = False        # one Chrome driving THREAD_COUNT tabs instead of one Chrome per thread
+READY_TIMEOUT = 15      # max seconds to wait for dealer cards / empty-result marker
+EXTRACT_MODE = "script" # "script" (one execute_script), "html" (page_source + offline parser) or "webdriver"
+FETCH_BACKEND = os.environ.get("FETCH_BACKEND", "auto")  # "auto" (HTTP, Selenium fallback), "http" or "selenium"
+ENGINE = "threads"      # "threads" (THREAD_COUNT workers) or "async" (event loop, ASYNC_CONCURRENCY in flight)
+ASYNC_CONCURRENCY = 1000
+PARSE_PROCESSES = 4     # async engine: processes that parse HTML off the event loop
+PROCESS_COUNT = 1       # >1 shards states (big ones by ZIP prefix) across this many processes
+SHARD_MAX_ZIPS = 2000
+REFRESH_BUDGET = 0      # >0: also re-crawl up to this many already-scraped ZIPs per state, most-changing first
+SCHEDULE = "all"        # "all" (every ZIP) or "bisect" (skip ZIP runs whose ends return the same dealers)
+ORDER = "yield"         # "yield" (ZIPs with the most dealers last time / densest first, see yield_priority.py) or "file"
+OUTPUT = os.environ.get("OUTPUT_SINKS", "csv")  # any mix of "csv" (USA/<ST>/<ST>_<zip>.csv), "parquet" (USA/_parquet/state=<ST>/)
+                                                # "sqlite" (deduplicated dealers in USA/dealers.sqlite) and "log" (one
+                                                # USA/<ST>/_dealers.ndjson.gz per state, see append_log.py), e.g. "log,sqlite"
+# Pages are cached on disk (page_cache.py); PAGE_CACHE=only re-parses a state offline, PAGE_CACHE=off disables it
 
 ZIP_FOLDER = r"zipcode"   # folder containing all state JSONs
 
@@ -29,22 +65,64 @@ def get_driver():
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    if BLOCK_ASSETS:
+        apply_blocking_prefs(options)
+    if USE_TABS:
+        apply_tab_options(options)
+    driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=options)
     driver.set_window_size(1920, 1080)
+    if BLOCK_ASSETS:
+        enable_request_blocking(driver)
     return driver
 
+backend = build_backend(
+    FETCH_BACKEND, get_driver, use_driver_pool=USE_DRIVER_POOL, ready_timeout=READY_TIMEOUT,
+    tabs=THREAD_COUNT if USE_TABS else 0, tab_setup=enable_request_blocking if BLOCK_ASSETS else None,
+    extract_mode=EXTRACT_MODE,
+    max_browsers=lambda: controller.limit if controller else None,  # pooled browsers beyond the current worker limit are quit
+)
+
+SINKS = parse_sinks(OUTPUT)
+parquet_sink = ParquetSink() if "parquet" in SINKS else None
+dealer_store = DealerStore() if "sqlite" in SINKS else None
+state_logs = {}    # state_abbr → StateLog (when the "log" sink is on)
+recent_results = RecentResults()  # lets the row sinks write bisect-inferred ZIPs in full
+
+controller = None  # AIMDController of the state being scraped (set in run_state)
+breaker = None     # CircuitBreaker shared by that state's workers (set in run_state)
+refresh_zips = set()  # that state's refresh re-checks: fetched past the page cache (set in run_state)
+
 # ----------------------
 # CHECK EXISTING CSV
 # ----------------------
 def get_processed_zips(state_abbr):
-    """Return set of ZIP codes with existing, non-empty CSV files in the state's directory."""
+    """Return set of ZIP codes the crawl journal has as done, plus any found in the state's folder.
+
+    The folder is scanned every time, so ZIPs written by scraper_single_page2.py, older runs or by hand
+    are skipped too; ones the journal didn't know yet are recorded in it as done.
+    """
+    journal = get_journal()
+    done = journal.done_zips(state_abbr)
+    found = scan_output_folder(state_abbr) - done
+    if found:
+        manifest = get_manifest(state_abbr).entries
+        journal.mark_many(state_abbr, [
+            (z, "done", manifest[z]["records"] if z in manifest else None, "found in output folder")
+            for z in sorted(found)
+        ])
+    return done | found
+
+def scan_output_folder(state_abbr):
+    """Return set of ZIP codes with existing, non-empty CSV files (or a manifest entry) in the state's directory."""
     folder_path = f"USA/{state_abbr}"
     processed_zips = set()
     if not os.path.exists(folder_path):
         return processed_zips
+    processed_zips.update(get_manifest(state_abbr).entries)  # ZIPs stored as references have no CSV
+    processed_zips.update(StateLog(folder_path).load_index())  # ZIPs in the per-state append log
     for file_name in os.listdir(folder_path):
-        if file_name.startswith(f"{state_abbr}_") and file_name.endswith(".csv"):
-            zip_code = file_name[len(state_abbr) + 1:-4]  # Extract ZIP
+        zip_code = zip_from_csv_name(state_abbr, file_name)  # <ST>_<zip>.csv or a refreshed <ST>_<zip>_<fp8>.csv
+        if zip_code is not None:
             try:
                 if os.path.getsize(os.path.join(folder_path, file_name)) > 0:
                     processed_zips.add(zip_code)
@@ -55,200 +133,416 @@ def get_processed_zips(state_abbr):
 # ----------------------
 # BATCH HANDLING
 # ----------------------
-batch_results = {}   # state_abbr → list of (zip, dealers)
-batch_lock = threading.Lock()
-
-def flush_batch_to_csv(state_abbr):
-    """Write all ZIPs in batch to individual CSV files."""
-    global batch_results
-    if not batch_results[state_abbr]:
+writers = {}         # state_abbr → BatchWriter that owns the state's CSVs, manifest and journal
+completed_zipcodes = []
+dealers_found = {}     # state_abbr → dealer records scraped this run (shown on the progress bar)
+manifests = {}       # state_abbr → ResultManifest
+
+def get_manifest(state_abbr):
+    if state_abbr not in manifests:
+        manifests[state_abbr] = ResultManifest(f"USA/{state_abbr}")
+    return manifests[state_abbr]
+
+def get_state_log(state_abbr):
+    if state_abbr not in state_logs:
+        state_logs[state_abbr] = StateLog(f"USA/{state_abbr}")
+    return state_logs[state_abbr]
+
+def retire_superseded_csv(manifest, zip_code, previous):
+    """Delete a ZIP's earlier CSV once the manifest points the ZIP elsewhere and no other ZIP uses it.
+
+    Otherwise merge.py, which only skips files the manifest knows, would read the stale file as live data.
+    """
+    if previous is None or not previous["file"].endswith(".csv") or previous["file"] == manifest.entries[zip_code]["file"]:
         return
-
+    if manifest.shared_by_others(previous["file"], zip_code):
+        return
+    try:
+        os.remove(previous["file"])
+        print(f"🗑️ {zip_code}: removed superseded {previous['file']}")
+    except OSError:
+        pass
+
+def flush_batch(state_abbr, batch):
+    """Writer thread: write the batch's results to the configured sinks and record them in the journal.
+
+    batch holds ("result", zip, dealers, fingerprint, report row) and ("status", zip, status, None, reason)
+    items. CSV repeats of an earlier result become manifest references; Parquet, the dealer store and
+    the append log get every ZIP's rows (the store collapses duplicate dealers itself).
+    """
     folder_path = f"USA/{state_abbr}"
     os.makedirs(folder_path, exist_ok=True)
+    manifest = get_manifest(state_abbr)
+    journal_changes = []  # ZIPs count as done only once their result is on disk
+    row_results = []  # (zip, dealers) for the Parquet / SQLite / log sinks
+    row_sinks = SINKS & {"parquet", "sqlite", "log"}
+
+    for kind, zip_code, dealers, fingerprint, row in batch:
+        if kind == "status":  # dealers is the status and row the reason here
+            journal_changes.append((zip_code, dealers, None, row))
+            continue
+        if row_sinks:
+            if dealers is not None:
+                recent_results.remember(fingerprint, dealers)
+            rows = dealers if dealers is not None else recent_results.rows_for(fingerprint)  # bisect-inferred ZIPs
+            if rows is not None:
+                row_results.append((zip_code, rows))
+            if "csv" not in SINKS:
+                if rows is None:
+                    journal_changes.append((zip_code, "failed", None, "inferred from a result that was never written"))
+                    continue
+                if "log" in SINKS:
+                    row["file"] = get_state_log(state_abbr).path
+                elif parquet_sink is not None:
+                    row["file"] = parquet_sink.partition_dir(state_abbr)
+                else:
+                    row["file"] = dealer_store.path
+                manifest.add(zip_code, fingerprint, row["file"], len(rows))  # keeps fingerprints for refresh mode
+                journal_changes.append((zip_code, "done", len(rows), None))
+                continue
+        previous = manifest.entries.get(zip_code)
+        canonical = manifest.canonical_file(fingerprint)
+        if canonical is not None and canonical.endswith(".csv"):
+            manifest.add(zip_code, fingerprint, canonical, row["records"])
+            retire_superseded_csv(manifest, zip_code, previous)
+            row["file"] = canonical
+            journal_changes.append((zip_code, "done", row["records"], None))
+            print(f"🔗 {zip_code}: same dealers as → {canonical}")
+            continue
+        if dealers is None:
+            journal_changes.append((zip_code, "failed", None, "inferred from a result that was never written"))
+            print(f"⚠️ {zip_code}: inferred from a result that was never written, skipping")
+            continue
 
-    for zip_code, dealers in batch_results[state_abbr]:
         output_file = os.path.join(folder_path, f"{state_abbr}_{zip_code}.csv")
-        with open(output_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Business Name", "Phone(s)", "Address"])
-            writer.writerows(dealers)
+        if manifest.shared_by_others(output_file, zip_code):
+            # A refreshed ZIP changed, but other ZIPs still reference its old result
+            output_file = os.path.join(folder_path, f"{state_abbr}_{zip_code}_{fingerprint[:8]}.csv")
+        write_csv(output_file, dealers)
+        manifest.add(zip_code, fingerprint, output_file, len(dealers))
+        retire_superseded_csv(manifest, zip_code, previous)
+        row["file"] = output_file
+        journal_changes.append((zip_code, "done", len(dealers), None))
         print(f"📝 Wrote → {output_file} ({len(dealers)} records)")
 
-    batch_results[state_abbr] = []  # reset batch
+    if row_results and parquet_sink is not None:
+        path = parquet_sink.write_batch(state_abbr, row_results)
+        if path is not None:
+            print(f"📦 Wrote → {path} ({len(row_results)} ZIPs)")
+    if row_results and "log" in SINKS:
+        state_log = get_state_log(state_abbr)
+        state_log.append(row_results)
+        print(f"📝 Appended {len(row_results)} ZIPs → {state_log.path}")
+    if row_results and dealer_store is not None:
+        new_dealers = dealer_store.upsert_batch(state_abbr, row_results)
+        print(f"🗄️ Stored {sum(len(r) for _, r in row_results)} records from {len(row_results)} ZIPs "
+              f"({new_dealers} new dealers) → {dealer_store.path}")
+    get_journal().mark_many(state_abbr, journal_changes)
 
 # ----------------------
-# SCRAPER FUNCTION
+# RESULT HANDLING
 # ----------------------
-def scrape_zip(zip_code, state_abbr, progress_lock, report_list, progress_bar):
-    start_time = time.time()
-    url = f"https://www.cars.com/dealers/buy/?page=1&page_size=200&zip={zip_code}"
+def record_result(zip_code, state_abbr, all_dealers, row, progress_lock, report_list, progress_bar):
+    """Add a ZIP's report row and queue its dealers for the next output batch (all_dealers is None on failure)."""
+    with progress_lock:
+        if all_dealers is None:
+            row["file"] = "ERROR"
+            print(f"[{zip_code}] ❌ Error after {row['attempts']} attempts: {row['status']}")
+        else:
+            row["file"] = f"USA/{state_abbr}/{state_abbr}_{zip_code}.csv"
+            completed_zipcodes.append(zip_code)
+        report_list.append(row)
+        progress_bar.update(1)
+        if all_dealers is not None:
+            report_yield(progress_bar, state_abbr, len(all_dealers))
+
+    if all_dealers is None:
+        writers[state_abbr].put(("status", zip_code, "failed", None, row["status"]))
+        return
 
-    for attempt in range(1, MAX_RETRIES + 1):
-        driver = None
-        try:
-            driver = get_driver()
-            driver.get(url)
-            time.sleep(5)
-
-            all_dealers = []
-            dealers = driver.find_elements(By.CSS_SELECTOR, "div.sds-container.dealer-card")
-
-            for dealer in dealers:
-                try:
-                    name = dealer.find_element(By.CSS_SELECTOR, "h2.dealer-heading").text.strip()
-                except:
-                    name = "N/A"
-                try:
-                    address = dealer.find_element(By.CSS_SELECTOR, "div.dealer-address a.sds-link--ext").text.strip()
-                except:
-                    address = "N/A"
-                phones = []
-                try:
-                    phone_elements = dealer.find_elements(By.CSS_SELECTOR, "a.phone-number, .desktop-phone-number")
-                    for p in phone_elements:
-                        ph = p.text.strip()
-                        if ph and ph not in phones:
-                            phones.append(ph)
-                except:
-                    pass
-                phone_str = "; ".join(phones) if phones else "N/A"
-                all_dealers.append([name, phone_str, address])
-
-            elapsed = time.time() - start_time
-            with progress_lock:
-                report_list.append({
-                    "zip": zip_code,
-                    "records": len(all_dealers),
-                    "file": f"USA/{state_abbr}/{state_abbr}_{zip_code}.csv",
-                    "time_sec": round(elapsed, 2),
-                    "status": "success",
-                    "attempts": attempt
-                })
-                completed_zipcodes.append(zip_code)
-                progress_bar.update(1)
-
-            # Add to batch
-            with batch_lock:
-                batch_results[state_abbr].append((zip_code, all_dealers))
-                if len(batch_results[state_abbr]) >= BATCH_SIZE:
-                    flush_batch_to_csv(state_abbr)
-
-            return  # ✅ success
-
-        except Exception as e:
-            if attempt == MAX_RETRIES:
-                elapsed = time.time() - start_time
-                with progress_lock:
-                    report_list.append({
-                        "zip": zip_code,
-                        "records": 0,
-                        "file": "ERROR",
-                        "time_sec": round(elapsed, 2),
-                        "status": f"failed ({e})",
-                        "attempts": attempt
-                    })
-                    print(f"[{zip_code}] ❌ Error after {attempt} attempts: {e}")
-                    progress_bar.update(1)
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+    # Add to batch (hashed now, so the flush can tell repeats from new results)
+    add_to_batch(state_abbr, zip_code, all_dealers, dealer_fingerprint(all_dealers), row)
+
+def report_yield(progress_bar, state_abbr, records):
+    """Show the state's cumulative dealer records on its progress bar (call under progress_lock)."""
+    if isinstance(progress_bar, QueueProgress):
+        progress_bar.add_yield(state_abbr, records)  # the parent process keeps the totals
+        return
+    dealers_found[state_abbr] += records
+    progress_bar.set_postfix(records=dealers_found[state_abbr], refresh=False)
+
+def add_to_batch(state_abbr, zip_code, dealers, fingerprint, row):
+    """Hand a result to the state's writer thread (blocks only while the writer is far behind)."""
+    writers[state_abbr].put(("result", zip_code, dealers, fingerprint, row))
+
+def record_inferred(zip_code, source_zip, records, fingerprint, state_abbr, progress_lock, report_list, progress_bar):
+    """Report a ZIP skipped by the bisect schedule: same dealers as source_zip, stored as a manifest reference."""
+    row = {
+        "zip": zip_code,
+        "records": records,
+        "file": f"USA/{state_abbr}/{state_abbr}_{source_zip}.csv",
+        "time_sec": 0,
+        "backend": "-",
+        "pages": 0,
+        "status": "inferred",
+        "attempts": 0
+    }
+    with progress_lock:
+        report_list.append(row)
+        print(f"[{zip_code}] 🔗 Inferred from {source_zip} ({records} records)")
+        progress_bar.update(1)
+    add_to_batch(state_abbr, zip_code, None, fingerprint, row)
+
+# ----------------------
+# SCRAPER FUNCTION
+# ----------------------
+def attempt_zip(zip_code, attempt, start_time, state_abbr, progress_lock, report_list, progress_bar):
+    """One fetch attempt for a ZIP; records it on success or final failure.
+
+    Returns (dealers, retry_delay): retry_delay is the backoff before the next attempt, None when the ZIP is done.
+    """
+    breaker.wait()  # every worker pauses while the circuit is open
+    writers[state_abbr].put(("status", zip_code, "in_flight", None, None))
+    attempt_start = time.time()
+    try:
+        result = backend.fetch_dealers(zip_code, fresh=zip_code in refresh_zips)
+    except Exception as e:
+        kind = classify(e)
+        controller.record(False, time.time() - attempt_start)
+        breaker.record(False)
+        if attempt < MAX_RETRIES and is_retryable(kind):
+            return None, backoff(kind, attempt)
+        record_result(zip_code, state_abbr, None, {
+            "zip": zip_code,
+            "records": 0,
+            "time_sec": round(time.time() - start_time, 2),
+            "workers": controller.limit,
+            "status": f"failed ({kind}: {e})",
+            "attempts": attempt
+        }, progress_lock, report_list, progress_bar)
+        return None, None
+
+    all_dealers = result["dealers"]
+    controller.record(True, time.time() - attempt_start)
+    breaker.record(True)
+    record_result(zip_code, state_abbr, all_dealers, {
+        "zip": zip_code,
+        "records": len(all_dealers),
+        "time_sec": round(time.time() - start_time, 2),
+        "ready_sec": result["ready_sec"],
+        "backend": result["backend"],
+        "pages": result["pages"],
+        "workers": controller.limit,
+        "status": "success",
+        "attempts": attempt
+    }, progress_lock, report_list, progress_bar)
+    return all_dealers, None  # ✅ success
 
 # ----------------------
 # THREAD WORKER
 # ----------------------
 def scrape_worker(queue, progress_lock, state_abbr, report_list, progress_bar):
-    while not queue.empty():
-        zip_code = queue.get()
+    """Take (zip, attempt, first_start) items; a retryable failure goes to the back of the queue after its backoff."""
+    while True:
+        item = queue.get()
+        if item is None:
+            break
+        zip_code, attempt, start_time = item
+        start_time = start_time or time.time()
+        try:
+            with controller.slot():
+                dealers, delay = attempt_zip(zip_code, attempt, start_time, state_abbr, progress_lock, report_list, progress_bar)
+        except Exception:
+            queue.done()
+            raise
+        if delay is None:
+            queue.done()
+        else:
+            queue.retry((zip_code, attempt + 1, start_time), delay)
+
+def bisect_worker(scheduler, progress_lock, state_abbr, report_list, progress_bar):
+    while True:
+        zip_code = scheduler.get()
+        if zip_code is None:
+            break
+        attempt, start_time = scheduler.attempt(zip_code)
+        start_time = start_time or time.time()
         try:
-            if zip_code.strip():
-                scrape_zip(zip_code.strip(), state_abbr, progress_lock, report_list, progress_bar)
-        finally:
-            queue.task_done()
+            with controller.slot():
+                dealers, delay = attempt_zip(zip_code, attempt, start_time, state_abbr, progress_lock, report_list, progress_bar)
+        except Exception:
+            scheduler.report(zip_code, None)
+            raise
+        if delay is not None:
+            scheduler.retry(zip_code, delay, attempt + 1, start_time)  # backs off without holding a slot
+            continue
+        for inferred_zip, source_zip, records, fingerprint in scheduler.report(zip_code, dealers):
+            record_inferred(inferred_zip, source_zip, records, fingerprint, state_abbr, progress_lock, report_list, progress_bar)
 
 # ----------------------
-# MAIN
+# STATE RUNNER
 # ----------------------
-if __name__ == "__main__":
-    if not os.path.isdir(ZIP_FOLDER):
-        print(f"ZIP folder not found: {ZIP_FOLDER}")
-        exit()
+def run_state(state_abbr, zip_codes, progress_bar=None):
+    """Scrape one state's (or shard's) ZIPs and flush its CSVs; returns the report rows.
+
+    progress_bar is created here unless a shard process passes its QueueProgress.
+    """
+    global controller, breaker, refresh_zips
+    refresh_zips = set()
+    processed_zips = get_processed_zips(state_abbr)
+    journal = get_journal()
+    last_run = journal.summary(state_abbr)
+    if last_run["failed"] or last_run["in_flight"] or last_run["queued"]:
+        print(f"📒 {state_abbr}: {last_run['done']} ZIPs done earlier; retrying {last_run['failed']} failed, "
+              f"{last_run['in_flight']} interrupted mid-scrape and {last_run['queued']} never started")
+    if REFRESH_BUDGET and processed_zips and get_page_cache().offline:
+        print(f"⚠️ {state_abbr}: refresh needs the live site, skipping it with PAGE_CACHE=only")
+    elif REFRESH_BUDGET and processed_zips:
+        # Refresh mode: the manifest's fingerprint history decides which scraped ZIPs are worth re-checking
+        folder_path = f"USA/{state_abbr}"
+        refresh = pick_refresh(folder_path, [z.strip() for z in zip_codes if z.strip() in processed_zips], REFRESH_BUDGET)
+        processed_zips -= set(refresh)
+        refresh_zips = set(refresh)  # a cached page would always look unchanged
+        tracked, changing, rechecks = summarize_refresh(folder_path)
+        print(f"🔄 {state_abbr}: re-crawling {len(refresh)} of {tracked} scraped ZIPs "
+              f"({changing} changed in {rechecks} earlier re-checks)")
+    if ORDER == "yield" and SCHEDULE != "bisect":  # bisection needs the ZIPs in numeric order
+        zip_codes = order_by_yield(state_abbr, [z.strip() for z in zip_codes])
+    zip_queue = Queue()
+    for z in zip_codes:
+        if z.strip() not in processed_zips:
+            zip_queue.put(z.strip())
+        else:
+            print(f"[{z}] ⏭️ Skipped (already processed)")
+
+    total_zipcodes = zip_queue.qsize()
+    journal.mark_many(state_abbr, [(z, "queued", None, None) for z in zip_queue.queue])
+    if progress_bar is not None:
+        progress_bar.update(len(zip_codes) - total_zipcodes)  # skipped ZIPs count as done
+    if total_zipcodes == 0:
+        return []
+
+    progress_lock = threading.Lock()
+    report_list = []
+    breaker = CircuitBreaker()
+    if ADAPTIVE_WORKERS:
+        # Tab mode has a fixed number of tabs, so the controller can only shrink below it
+        controller = AIMDController(THREAD_COUNT, max_workers=THREAD_COUNT if USE_TABS else MAX_THREADS)
+    else:
+        controller = AIMDController(THREAD_COUNT, min_workers=THREAD_COUNT, max_workers=THREAD_COUNT)
+
+    writers[state_abbr] = BatchWriter(lambda batch: flush_batch(state_abbr, batch), batch_size=BATCH_SIZE,
+                                      name=f"writer-{state_abbr}")
+    dealers_found[state_abbr] = 0
+
+    own_bar = progress_bar is None
+    if own_bar:
+        progress_bar = tqdm(total=total_zipcodes, desc=f"Scraping {state_abbr}", ncols=100)
 
-    json_files = [f for f in os.listdir(ZIP_FOLDER) if f.endswith(".json")]
+    scheduler = BisectScheduler(list(zip_queue.queue)) if SCHEDULE == "bisect" else None
+
+    if ENGINE == "async":
+        def on_result(z, dealers, row):
+            record_result(z, state_abbr, dealers, row, progress_lock, report_list, progress_bar)
+            if scheduler is not None:
+                for inferred_zip, source_zip, records, fingerprint in scheduler.report(z, dealers):
+                    record_inferred(inferred_zip, source_zip, records, fingerprint, state_abbr, progress_lock, report_list, progress_bar)
+
+        # Bisect mode runs one wave per bisection level: the ZIPs whose ranges are ready to split
+        waves = iter(scheduler.take_ready, []) if scheduler is not None else [list(zip_queue.queue)]
+        for wave in waves:
+            # HTTP always goes first here; "auto"/"selenium" add the browser fallback for card-less pages
+            run_zip_queue_async(
+                wave,
+                on_result,
+                fallback=browser_fallback(backend),
+                concurrency=ASYNC_CONCURRENCY,
+                max_retries=MAX_RETRIES,
+                parse_processes=0 if PROCESS_COUNT > 1 else PARSE_PROCESSES,  # shards already have a process each
+                fallback_threads=THREAD_COUNT,
+                breaker=breaker,
+                fresh_zips=refresh_zips,
+            )
+    else:
+        if scheduler is not None:
+            worker, worker_input = bisect_worker, scheduler
+        else:
+            worker, worker_input = scrape_worker, RetryQueue([(z, 1, None) for z in zip_queue.queue])
+        threads = []
+        for _ in range(min(controller.max_workers, zip_queue.qsize())):
+            t = threading.Thread(target=worker, args=(worker_input, progress_lock, state_abbr, report_list, progress_bar))
+            t.start()
+            threads.append(t)
 
-    for json_file in json_files:
-        json_path = os.path.join(ZIP_FOLDER, json_file)
+        for t in threads:
+            t.join()
 
-        with open(json_path, "r", encoding="utf-8") as f:
+    if own_bar:
+        progress_bar.close()
+    backend.close()
+
+    # Write leftovers and wait for the writer to finish
+    writer = writers.pop(state_abbr)
+    writer.close()
+    if parquet_sink is not None:
+        parquet_sink.compact(state_abbr)
+    if writer.blocked_sec >= 1:
+        print(f"💾 {state_abbr}: scrapers waited {writer.blocked_sec:.1f}s on the CSV writer ({writer.batches} batches)")
+    # Written here rather than in save_state_report: a shard's controller lives in the shard's process
+    concurrency_file = write_concurrency_log(state_abbr, controller.history)
+    if concurrency_file:
+        print(f"👷 {state_abbr}: {len(controller.history)} worker-limit changes → {concurrency_file}")
+
+    return report_list
+
+def save_state_report(state_abbr, report_list, overall_elapsed):
+    if not report_list:
+        print(f"🎉 {state_abbr} complete! All ZIP codes already processed.")
+        return
+    report_file = write_state_report(state_abbr, report_list, overall_elapsed, total_file=f"USA/{state_abbr}/*.csv")
+    print(f"🎉 {state_abbr} complete! Report saved → {report_file}")
+    print(f"⚡ Throughput: {len(report_list) / overall_elapsed * 60:.1f} ZIPs/min (engine: {ENGINE}, backend: {FETCH_BACKEND}, browser: {'tabs' if USE_TABS else 'pool' if USE_DRIVER_POOL else 'per ZIP'})")
+    workers = [r["workers"] for r in report_list if r.get("workers")]
+    if workers:
+        print(f"👷 Workers: started {workers[0]}, ended {workers[-1]} (range {min(workers)}–{max(workers)}, see 'workers' column)")
+    inferred = sum(1 for r in report_list if r.get("status") == "inferred")
+    if inferred:
+        print(f"🔗 {inferred} of {len(report_list)} ZIPs inferred by bisection (not requested)")
+
+def load_state_jobs():
+    """Read every zipcode/<STATE>.json into a list of (state_abbr, zip_codes)."""
+    state_jobs = []
+    for json_file in os.listdir(ZIP_FOLDER):
+        if not json_file.endswith(".json"):
+            continue
+        with open(os.path.join(ZIP_FOLDER, json_file), "r", encoding="utf-8") as f:
             zip_json = json.load(f)
-
         if len(zip_json) != 1:
             print(f"⚠️ Skipping {json_file} (invalid format)")
             continue
-
         state_abbr = list(zip_json.keys())[0]
-        zip_codes = zip_json[state_abbr]
+        state_jobs.append((state_abbr, zip_json[state_abbr]))
+    return state_jobs
 
-        print(f"\n🚀 Starting state: {state_abbr} ({len(zip_codes)} ZIPs)")
+# ----------------------
+# MAIN
+# ----------------------
+if __name__ == "__main__":
+    if not os.path.isdir(ZIP_FOLDER):
+        print(f"ZIP folder not found: {ZIP_FOLDER}")
+        exit()
 
-        processed_zips = get_processed_zips(state_abbr)
-        zip_queue = Queue()
-        for z in zip_codes:
-            if z.strip() not in processed_zips:
-                zip_queue.put(z.strip())
-            else:
-                print(f"[{z}] ⏭️ Skipped (already processed)")
-
-        total_zipcodes = zip_queue.qsize()
-        if total_zipcodes == 0:
-            print(f"🎉 {state_abbr} complete! All ZIP codes already processed.")
-            continue
+    state_jobs = load_state_jobs()
 
-        completed_zipcodes = []
-        progress_lock = threading.Lock()
-        report_list = []
+    if PROCESS_COUNT > 1:
+        print(f"\n🚀 Starting {len(state_jobs)} states across {PROCESS_COUNT} processes")
+        run_shards(state_jobs, run_state, processes=PROCESS_COUNT, max_zips=SHARD_MAX_ZIPS,
+                   on_state_done=save_state_report)
+        exit()
 
-        batch_results[state_abbr] = []  # init batch
+    for state_abbr, zip_codes in state_jobs:
+        print(f"\n🚀 Starting state: {state_abbr} ({len(zip_codes)} ZIPs)")
 
         start_overall = time.time()
-        progress_bar = tqdm(total=total_zipcodes, desc=f"Scraping {state_abbr}", ncols=100)
-
-        threads = []
-        for _ in range(min(THREAD_COUNT, zip_queue.qsize())):
-            t = threading.Thread(target=scrape_worker, args=(zip_queue, progress_lock, state_abbr, report_list, progress_bar))
-            t.start()
-            threads.append(t)
-
-        for t in threads:
-            t.join()
-
-        progress_bar.close()
-
-        # Flush leftovers (<6 ZIPs)
-        with batch_lock:
-            flush_batch_to_csv(state_abbr)
-
-        overall_elapsed = time.time() - start_overall
-
-        # Save report per state
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = f"{state_abbr}_scrape_report_{timestamp}.csv"
-        with open(report_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["zip", "records", "file", "time_sec", "status", "attempts"])
-            writer.writeheader()
-            for row in report_list:
-                writer.writerow(row)
-            writer.writerow({
-                "zip": "TOTAL",
-                "records": sum(r['records'] for r in report_list),
-                "file": f"USA/{state_abbr}/*.csv",
-                "time_sec": round(overall_elapsed, 2),
-                "status": "completed",
-                "attempts": "-"
-            })
-
-        print(f"🎉 {state_abbr} complete! Report saved → {report_file}")
-
+        report_list = run_state(state_abbr, zip_codes)
+        save_state_report(state_abbr, report_list, time.time() - start_overall)
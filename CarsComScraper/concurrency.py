@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ----------------------
+# CONFIG
+# ----------------------
+MIN_WORKERS = 1
+MAX_WORKERS = 32          # worker threads started; the controller decides how many may work at once
+WINDOW = 20               # attempts per decision
+LATENCY_TARGET = 10.0     # p95 seconds per attempt above which the site counts as slowing down
+MAX_ERROR_RATE = 0.1      # share of failed attempts in a window that triggers a cut
+INCREASE_STEP = 1         # workers added after a healthy window
+DECREASE_FACTOR = 0.5     # workers kept after an unhealthy window
+
+def p95(values):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease limit on how many workers may scrape at once.
+
+    Workers wrap each ZIP in `with controller.slot():` and report every attempt with record().
+    After each WINDOW attempts the limit grows by INCREASE_STEP if errors and p95 latency were
+    within bounds, otherwise it is multiplied by DECREASE_FACTOR. history keeps
+    (elapsed_sec, workers, p95_sec, error_rate) per decision for the run log.
+    """
+
+    def __init__(self, start, min_workers=MIN_WORKERS, max_workers=MAX_WORKERS, window=WINDOW,
+                 latency_target=LATENCY_TARGET, max_error_rate=MAX_ERROR_RATE,
+                 increase=INCREASE_STEP, decrease=DECREASE_FACTOR):
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers)
+        self.limit = min(max(start, min_workers), self.max_workers)
+        self.window = window
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.active = 0
+        self.history = []
+        self._samples = deque()
+        self._cond = threading.Condition()
+        self._start = time.time()
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active -= 1
+                self._cond.notify()
+
+    def record(self, ok, latency):
+        with self._cond:
+            self._samples.append((ok, latency))
+            if len(self._samples) < self.window:
+                return
+            errors = sum(1 for ok, _ in self._samples if not ok)
+            error_rate = errors / len(self._samples)
+            latency_p95 = p95([latency for ok, latency in self._samples if ok])
+            self._samples.clear()
+
+            if error_rate > self.max_error_rate or latency_p95 > self.latency_target:
+                self.limit = max(self.min_workers, int(self.limit * self.decrease))
+            else:
+                self.limit = min(self.max_workers, self.limit + self.increase)
+            self.history.append((round(time.time() - self._start, 1), self.limit, round(latency_p95, 2),
+                                 round(error_rate, 3)))
+            self._cond.notify_all()
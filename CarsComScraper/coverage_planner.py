@@ -0,0 +1,114 @@
+import heapq
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+from zip_gazetteer import load_gazetteer, zips_by_state, haversine_miles, GAZETTEER_FILE
+
+# ----------------------
+# CONFIG
+# ----------------------
+SEARCH_RADIUS_MILES = 30   # radius the dealer search covers around a ZIP (the site's default)
+COVER_FACTOR = 0.8         # count a ZIP as covered only within this share of the radius (dealers sit off-centroid)
+ZIP_FOLDER = r"zipcode"    # work lists are written here as <STATE>.json, the format the scrapers read
+
+MILES_PER_DEGREE_LAT = 69.0
+
+# ----------------------
+# SPATIAL GRID
+# ----------------------
+class ZipGrid:
+    """Buckets ZIP centroids into cells at least `radius` miles wide, so a radius query reads 3x3 cells."""
+
+    def __init__(self, points, radius):
+        self.points = points  # {zip: (lat, lng, ...)}
+        self.radius = radius
+        max_lat = max((abs(p[0]) for p in points.values()), default=0.0)
+        self.cell_lat = radius / MILES_PER_DEGREE_LAT
+        # Widest degree span of `radius` miles is at the highest latitude, so size lng cells for that
+        self.cell_lng = radius / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(max_lat)), 0.01))
+        self.cells = defaultdict(list)
+        for zip_code, (lat, lng, *_) in points.items():
+            self.cells[self._cell(lat, lng)].append(zip_code)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_lat)), int(math.floor(lng / self.cell_lng))
+
+    def within(self, lat, lng):
+        """ZIPs whose centroid lies within the radius of (lat, lng)."""
+        row, col = self._cell(lat, lng)
+        found = []
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for zip_code in self.cells.get((row + dr, col + dc), ()):
+                    z_lat, z_lng = self.points[zip_code][:2]
+                    if haversine_miles(lat, lng, z_lat, z_lng) <= self.radius:
+                        found.append(zip_code)
+        return found
+
+# ----------------------
+# GREEDY SET COVER
+# ----------------------
+def plan_cover(points, radius):
+    """Near-minimal list of ZIPs whose radius circles cover every ZIP in `points`.
+
+    Greedy set cover: repeatedly take the ZIP covering the most still-uncovered ZIPs. Gains only
+    shrink as ZIPs get covered, so stale heap entries are re-scored lazily instead of rescanning.
+    """
+    grid = ZipGrid(points, radius)
+    covers = {zip_code: set(grid.within(lat, lng)) for zip_code, (lat, lng, *_) in points.items()}
+    uncovered = set(points)
+    heap = [(-len(c), zip_code) for zip_code, c in covers.items()]
+    heapq.heapify(heap)
+
+    chosen = []
+    while uncovered and heap:
+        neg_gain, zip_code = heapq.heappop(heap)
+        gain = len(covers[zip_code] & uncovered)
+        if gain == 0:
+            continue
+        if gain < -neg_gain:
+            heapq.heappush(heap, (-gain, zip_code))
+            continue
+        chosen.append(zip_code)
+        uncovered -= covers[zip_code]
+    return sorted(chosen)
+
+def plan_state(gazetteer, state_abbr, radius=SEARCH_RADIUS_MILES * COVER_FACTOR):
+    points = {z: p for z, p in gazetteer.items() if p[2] == state_abbr}
+    return plan_cover(points, radius) if points else []
+
+def write_work_list(state_abbr, zip_codes, folder=ZIP_FOLDER):
+    """Write zipcode/<STATE>.json as {"<STATE>": [zips]}."""
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, f"{state_abbr}.json")
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({state_abbr: zip_codes}, f, indent=2)
+    return file_path
+
+def main(states=None, gazetteer_file=GAZETTEER_FILE, folder=ZIP_FOLDER):
+    gazetteer = load_gazetteer(gazetteer_file)
+    by_state = zips_by_state(gazetteer)
+    states = states or sorted(s for s in by_state if s)
+    radius = SEARCH_RADIUS_MILES * COVER_FACTOR
+
+    total_zips = total_chosen = 0
+    for state_abbr in states:
+        state_zips = by_state.get(state_abbr, [])
+        if not state_zips:
+            print(f"⚠️ No ZIPs for {state_abbr} in {gazetteer_file}")
+            continue
+        chosen = plan_state(gazetteer, state_abbr, radius)
+        file_path = write_work_list(state_abbr, chosen, folder)
+        total_zips += len(state_zips)
+        total_chosen += len(chosen)
+        print(f"✅ {state_abbr}: {len(state_zips)} ZIPs covered by {len(chosen)} searches → {file_path}")
+
+    if total_chosen:
+        print(f"\n📉 {total_zips} ZIPs → {total_chosen} searches "
+              f"({total_zips / total_chosen:.1f}x fewer requests, {radius:.0f}-mile cover radius)")
+
+if __name__ == "__main__":
+    # python coverage_planner.py [STATE ...]
+    main([s.upper() for s in sys.argv[1:]])
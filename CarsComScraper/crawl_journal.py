@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# ----------------------
+# CONFIG
+# ----------------------
+JOURNAL_FILE = os.environ.get("CRAWL_JOURNAL", "USA/_crawl_journal.sqlite")
+STATUSES = ("queued", "in_flight", "done", "failed")
+
+class CrawlJournal:
+    """Crash-safe record of every ZIP's crawl status, shared by all threads and shard processes.
+
+    events is append-only (one row per status change, never updated); zips holds each ZIP's latest
+    status so a resume is one indexed query per state. SQLite in WAL mode commits each change
+    before the call returns, so a crash loses at most the ZIPs that were still in flight.
+    A ZIP only becomes "done" once its CSV (or manifest reference) has been written.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self.pid = os.getpid()
+
+    def _conn(self):
+        """Open the journal on first use. Caller holds the lock."""
+        if self._db is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent after a crash; fsync per checkpoint
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY, at REAL NOT NULL, state TEXT NOT NULL, zip TEXT NOT NULL,
+                    status TEXT NOT NULL, records INTEGER, reason TEXT, pid INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS zips (
+                    state TEXT NOT NULL, zip TEXT NOT NULL, status TEXT NOT NULL, records INTEGER,
+                    reason TEXT, attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL,
+                    PRIMARY KEY (state, zip)
+                );
+                CREATE INDEX IF NOT EXISTS zips_status ON zips (state, status);
+            """)
+        return self._db
+
+    def mark_many(self, state_abbr, changes):
+        """Record [(zip, status, records, reason)] in one transaction. "in_flight" counts an attempt."""
+        if not changes:
+            return
+        now = time.time()
+        pid = os.getpid()
+        for _, status, _, _ in changes:
+            if status not in STATUSES:
+                raise ValueError(f"Unknown crawl status: {status!r} (expected one of {STATUSES})")
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.executemany(
+                    "INSERT INTO events (at, state, zip, status, records, reason, pid) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(now, state_abbr, z, status, records, reason, pid) for z, status, records, reason in changes])
+                db.executemany("""
+                    INSERT INTO zips (state, zip, status, records, reason, attempts, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (state, zip) DO UPDATE SET
+                        status = excluded.status, records = excluded.records, reason = excluded.reason,
+                        attempts = zips.attempts + excluded.attempts, updated_at = excluded.updated_at
+                """, [(state_abbr, z, status, records, reason, 1 if status == "in_flight" else 0, now)
+                      for z, status, records, reason in changes])
+
+    def mark(self, state_abbr, zip_code, status, records=None, reason=None):
+        self.mark_many(state_abbr, [(zip_code, status, records, reason)])
+
+    def statuses(self, state_abbr):
+        """{zip: (status, records, reason)} for every ZIP of the state the journal has seen."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT zip, status, records, reason FROM zips WHERE state = ?", (state_abbr,)).fetchall()
+        return {z: (status, records, reason) for z, status, records, reason in rows}
+
+    def done_zips(self, state_abbr):
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT zip FROM zips WHERE state = ? AND status = 'done'", (state_abbr,)).fetchall()
+        return {z for z, in rows}
+
+    def summary(self, state_abbr):
+        """Counter of the state's ZIPs by status."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT status, COUNT(*) FROM zips WHERE state = ? GROUP BY status", (state_abbr,)).fetchall()
+        return Counter(dict(rows))
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_journal():
+    """The process-wide journal at JOURNAL_FILE (a fresh connection after a fork)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared.pid != os.getpid():
+            _shared = CrawlJournal()
+        return _shared
@@ -0,0 +1,320 @@
+import hashlib
+import os
+import re
+import sys
+import time
+import soupsieve
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+
+PAGE_SIZE = 200   # dealers per search page (the site's maximum)
+MAX_PAGES = 10    # safety cap when the result count can't be read
+
+SEARCH_URL = "https://www.cars.com/dealers/buy/?page={page}&page_size={page_size}&zip={zip_code}"
+
+def search_url(zip_code, page=1, page_size=PAGE_SIZE):
+    return SEARCH_URL.format(zip_code=zip_code, page=page, page_size=page_size)
+
+# ----------------------
+# SELECTORS
+# ----------------------
+DEALER_CARD_SELECTOR = "div.sds-container.dealer-card"
+NAME_SELECTOR = "h2.dealer-heading"
+ADDRESS_SELECTOR = "div.dealer-address a.sds-link--ext"
+PHONE_SELECTOR = "a.phone-number, .desktop-phone-number"
+
+CSV_HEADER = ["Business Name", "Phone(s)", "Address"]
+
+def _clean(text):
+    """Collapse whitespace the way WebDriver's .text does for a single line."""
+    return " ".join(text.split())
+
+def _row(name, phones, address):
+    """Build a [name, phones, address] row with the usual "N/A" defaults and de-duplicated phones."""
+    unique_phones = []
+    for ph in phones:
+        if ph and ph not in unique_phones:
+            unique_phones.append(ph)
+    phone_str = "; ".join(unique_phones) if unique_phones else "N/A"
+    return ["N/A" if name is None else name, phone_str, "N/A" if address is None else address]
+
+def dealer_key(row):
+    """Case/whitespace-insensitive identity of a dealer row: name + address."""
+    return f"{_clean(row[0]).lower()}|{_clean(row[2]).lower()}"
+
+def dealer_fingerprint(rows):
+    """Short hash of the sorted dealer keys; two ZIPs with the same dealer list get the same fingerprint."""
+    keys = sorted(set(dealer_key(row) for row in rows))
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+# ----------------------
+# RESULT COUNT / PAGINATION
+# ----------------------
+# Total number of dealers for the search: embedded JSON first, then the visible "N dealers" heading.
+RESULT_COUNT_PATTERNS = [
+    r'"total_?(?:[Cc]ount|[Ee]ntries|[Rr]esults)"\s*:\s*(\d+)',
+    r'\b(\d{1,3}(?:,\d{3})*|\d+)\s+(?:[Dd]ealers|[Dd]ealerships|[Rr]esults)\b(?!\s+per)',
+]
+_RESULT_COUNT_RES = [re.compile(p) for p in RESULT_COUNT_PATTERNS]
+
+def parse_result_count(text):
+    """Total dealer count for the search, or None if the page doesn't say."""
+    for pattern in _RESULT_COUNT_RES:
+        match = pattern.search(text)
+        if match:
+            return int(match.group(1).replace(",", ""))
+    return None
+
+def count_from_driver(driver):
+    return parse_result_count(driver.execute_script("return document.body ? document.body.innerText : '';") or "")
+
+def parse_search_page(html):
+    """(dealer rows, total dealer count or None) for one search results page."""
+    return parse_dealer_cards(html), parse_result_count(html)
+
+def pages_for(total, page_size=PAGE_SIZE):
+    """Number of pages a known result count spans (capped at MAX_PAGES)."""
+    return min(MAX_PAGES, max(1, -(-total // page_size)))
+
+def merge_pages(pages):
+    """Concatenate per-page rows in page order, dropping rows repeated across pages."""
+    seen = set()
+    all_dealers = []
+    for rows in pages:
+        for row in rows:
+            key = tuple(row)
+            if key not in seen:
+                seen.add(key)
+                all_dealers.append(row)
+    return all_dealers
+
+def extra_pages(rows, total, page_size=PAGE_SIZE):
+    """Pages to fetch after page 1: a list to fetch all at once, [] if page 1 is everything, None to walk.
+
+    A short page 1 is the whole result, whatever total it reports. A full page 1 fans out to the pages
+    its total spans; with the total unknown or no bigger than a page (the count patterns can match stray
+    "N dealers" text), pages are walked one by one until a short page.
+    """
+    if len(rows) < page_size:
+        return []  # a stray "5,000 dealers" match must not fan out a sparse ZIP
+    if total is not None and total > page_size:
+        return list(range(2, pages_for(total, page_size) + 1))
+    return None
+
+def paginate(load_page, workers=0, page_size=PAGE_SIZE):
+    """Fetch every results page of one ZIP search; returns (merged rows, pages fetched).
+
+    load_page(page) -> (rows, total or None). Which pages follow page 1 is up to extra_pages(); a
+    known page list is fetched on a thread pool of `workers` (sequentially when workers is 0).
+    """
+    rows, total = load_page(1)
+    pages = [rows]
+    extra = extra_pages(rows, total, page_size)
+    if extra:
+        if workers and len(extra) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(extra))) as executor:
+                pages.extend(executor.map(lambda page: load_page(page)[0], extra))
+        else:
+            pages.extend(load_page(page)[0] for page in extra)
+    elif extra is None:
+        for page in range(2, MAX_PAGES + 1):
+            rows, _ = load_page(page)
+            if not rows:
+                break
+            pages.append(rows)
+            if len(rows) < page_size:
+                break
+    return merge_pages(pages), len(pages)
+
+# ----------------------
+# LIVE BROWSER (one WebDriver call per field)
+# ----------------------
+def read_dealer_cards(driver):
+    """Read dealer rows from the page currently loaded in driver."""
+    all_dealers = []
+    for dealer in driver.find_elements(By.CSS_SELECTOR, DEALER_CARD_SELECTOR):
+        try:
+            name = dealer.find_element(By.CSS_SELECTOR, NAME_SELECTOR).text.strip()
+        except:
+            name = "N/A"
+        try:
+            address = dealer.find_element(By.CSS_SELECTOR, ADDRESS_SELECTOR).text.strip()
+        except:
+            address = "N/A"
+        phones = []
+        try:
+            phones = [p.text.strip() for p in dealer.find_elements(By.CSS_SELECTOR, PHONE_SELECTOR)]
+        except:
+            pass
+        all_dealers.append(_row(name, phones, address))
+    return all_dealers
+
+# ----------------------
+# LIVE BROWSER (one execute_script per page)
+# ----------------------
+# Returns [[name|null, [phones...], address|null], ...]; innerText matches WebDriver's .text for visible nodes.
+_EXTRACT_SCRIPT = """
+const [cardSel, nameSel, addressSel, phoneSel] = arguments;
+const text = el => (el.innerText || "").trim();
+return Array.from(document.querySelectorAll(cardSel), card => {
+    const name = card.querySelector(nameSel);
+    const address = card.querySelector(addressSel);
+    return [
+        name ? text(name) : null,
+        Array.from(card.querySelectorAll(phoneSel), text),
+        address ? text(address) : null,
+    ];
+});
+"""
+
+def extract_dealer_cards(driver):
+    """Same rows as read_dealer_cards(), but all cards come back from a single script call."""
+    cards = driver.execute_script(_EXTRACT_SCRIPT, DEALER_CARD_SELECTOR, NAME_SELECTOR, ADDRESS_SELECTOR, PHONE_SELECTOR)
+    return [_row(name, phones, address) for name, phones, address in cards or []]
+
+EXTRACT_MODES = ("script", "html", "webdriver")
+
+def dealers_from_driver(driver, mode="script"):
+    """Read the loaded page's dealer rows.
+
+    "script" = one execute_script, "html" = page_source parsed offline, "webdriver" = per-element calls.
+    """
+    if mode == "script":
+        return extract_dealer_cards(driver)
+    if mode == "html":
+        return parse_dealer_cards(driver.page_source)
+    if mode == "webdriver":
+        return read_dealer_cards(driver)
+    raise ValueError(f"Unknown extract mode: {mode!r} (expected one of {EXTRACT_MODES})")
+
+# ----------------------
+# RAW HTML (selectolax → lxml → BeautifulSoup, whichever is installed)
+# ----------------------
+# WebDriver's .text breaks lines at <br> and block elements; a marker after each such tag lets the
+# offline parsers do the same (raw newlines in the source are only formatting, like any other space).
+_LINE_BREAK = "\ue000"
+_BREAK_TAG_RE = re.compile(r"<(?:br|/?(?:div|p|h[1-6]))\b[^>]*>", re.I)
+
+def _mark_line_breaks(html):
+    return _BREAK_TAG_RE.sub(lambda m: m.group(0) + _LINE_BREAK, html)
+
+def _text(text):
+    """Extracted text the way WebDriver's .text reads it: spaces collapsed per line, blank lines dropped."""
+    lines = (" ".join(part.split()) for part in text.split(_LINE_BREAK))
+    return "\n".join(line for line in lines if line)
+
+def _parse_selectolax(html):
+    tree = LexborHTMLParser(_mark_line_breaks(html))
+    all_dealers = []
+    for dealer in tree.css(DEALER_CARD_SELECTOR):
+        name_el = dealer.css_first(NAME_SELECTOR)
+        address_el = dealer.css_first(ADDRESS_SELECTOR)
+        phones = [_text(p.text()) for p in dealer.css(PHONE_SELECTOR)]
+        all_dealers.append(_row(
+            _text(name_el.text()) if name_el is not None else None,
+            phones,
+            _text(address_el.text()) if address_el is not None else None,
+        ))
+    return all_dealers
+
+def _lxml_text(el):
+    return _text("".join(el.itertext()))
+
+def _parse_lxml(html):
+    tree = lxml_html.fromstring(_mark_line_breaks(html))
+    all_dealers = []
+    for dealer in _LXML_CARD(tree):
+        name_els = _LXML_NAME(dealer)
+        address_els = _LXML_ADDRESS(dealer)
+        phones = [_lxml_text(p) for p in _LXML_PHONE(dealer)]
+        all_dealers.append(_row(
+            _lxml_text(name_els[0]) if name_els else None,
+            phones,
+            _lxml_text(address_els[0]) if address_els else None,
+        ))
+    return all_dealers
+
+def _parse_bs4(html):
+    soup = BeautifulSoup(_mark_line_breaks(html), "html.parser")
+    all_dealers = []
+    for dealer in _SV_CARD.select(soup):
+        name_el = _SV_NAME.select_one(dealer)
+        address_el = _SV_ADDRESS.select_one(dealer)
+        phones = [_text(p.get_text()) for p in _SV_PHONE.select(dealer)]
+        all_dealers.append(_row(
+            _text(name_el.get_text()) if name_el else None,
+            phones,
+            _text(address_el.get_text()) if address_el else None,
+        ))
+    return all_dealers
+
+# Selectors are compiled once at import for whichever parsers are available.
+HTML_PARSERS = {}
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HTML_PARSERS["selectolax"] = _parse_selectolax
+except ImportError:
+    pass
+try:
+    from lxml import html as lxml_html
+    from lxml.cssselect import CSSSelector
+    _LXML_CARD = CSSSelector(DEALER_CARD_SELECTOR)
+    _LXML_NAME = CSSSelector(NAME_SELECTOR)
+    _LXML_ADDRESS = CSSSelector(ADDRESS_SELECTOR)
+    _LXML_PHONE = CSSSelector(PHONE_SELECTOR)
+    HTML_PARSERS["lxml"] = _parse_lxml
+except ImportError:
+    pass
+_SV_CARD = soupsieve.compile(DEALER_CARD_SELECTOR)
+_SV_NAME = soupsieve.compile(NAME_SELECTOR)
+_SV_ADDRESS = soupsieve.compile(ADDRESS_SELECTOR)
+_SV_PHONE = soupsieve.compile(PHONE_SELECTOR)
+HTML_PARSERS["bs4"] = _parse_bs4
+
+HTML_PARSER = next(iter(HTML_PARSERS))  # fastest installed parser
+
+def parse_dealer_cards(html, parser=None):
+    """Parse dealer rows out of a dealer search page's HTML.
+
+    Same rows as read_dealer_cards(): text keeps WebDriver's line breaks at <br> and block tags.
+    """
+    return HTML_PARSERS[parser or HTML_PARSER](html)
+
+# ----------------------
+# MICRO-BENCHMARK
+# ----------------------
+def _benchmark(html_file, iterations=20, live=False):
+    with open(html_file, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    def timed(label, fn, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            rows = fn()
+        per_page = (time.perf_counter() - start) / n * 1000
+        print(f"{label:<22} {per_page:9.1f} ms/page  ({len(rows)} dealers)")
+
+    for name, parse in HTML_PARSERS.items():
+        timed(f"offline {name}", lambda: parse(html), iterations)
+
+    if live:
+        # The current path: a real browser on the same saved page
+        from selenium import webdriver
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        driver = webdriver.Chrome(options=options)
+        try:
+            driver.get("file://" + os.path.abspath(html_file))
+            timed("live webdriver", lambda: read_dealer_cards(driver), max(1, iterations // 10))
+            timed("live execute_script", lambda: extract_dealer_cards(driver), iterations)
+            timed("page_source + parse", lambda: parse_dealer_cards(driver.page_source), iterations)
+        finally:
+            driver.quit()
+
+if __name__ == "__main__":
+    # Usage: python dealer_cards.py saved_dealer_page.html [--live]
+    if len(sys.argv) < 2:
+        print("Usage: python dealer_cards.py <saved dealer search page .html> [--live]")
+        sys.exit(1)
+    _benchmark(sys.argv[1], live="--live" in sys.argv)
@@ -0,0 +1,149 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from dealer_cards import CSV_HEADER
+from output_sinks import split_phones
+
+# ----------------------
+# CONFIG
+# ----------------------
+DEALER_DB = os.environ.get("DEALER_DB", "USA/dealers.sqlite")
+STORE_COLUMNS = CSV_HEADER + ["State", "ZIPs"]   # columns of DealerStore.dealers()
+
+_ADDRESS_STATE_RE = re.compile(r"\b([A-Z]{2})\s+\d{5}(?:-\d{4})?\s*$")
+
+def _normalize(text):
+    """Lowercase, punctuation-free, single-spaced text ("N/A" counts as empty)."""
+    if not text or text == "N/A":
+        return ""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def normalize_phone(phone):
+    """Last 10 digits of a phone number ("(602) 555-0100" and "+1 602-555-0100" match)."""
+    return re.sub(r"\D", "", phone)[-10:]
+
+def normalized_key(row):
+    """name|sorted phones|address of a [name, phones, address] row, insensitive to case, punctuation and spacing."""
+    name, phones, address = row
+    phone_digits = sorted({p for p in (normalize_phone(ph) for ph in split_phones(phones)) if p})
+    return f"{_normalize(name)}|{','.join(phone_digits)}|{_normalize(address)}"
+
+def address_state(address, default=None):
+    """Two-letter state from the "..., City, ST 12345" end of an address, else default."""
+    match = _ADDRESS_STATE_RE.search(address or "")
+    return match.group(1) if match else default
+
+class DealerStore:
+    """One row per distinct dealer, upserted as ZIPs are scraped, plus which ZIPs surfaced it.
+
+    Dealers are keyed on normalized_key(), so the same dealer found from many ZIPs (or states)
+    collapses into one row at write time. dealer_zips links dealers to ZIPs and dealer_phones
+    makes phone lookups indexed. Shared by threads; shard processes open their own connection.
+    """
+
+    def __init__(self, path=DEALER_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        """Open the store on first use. Caller holds the lock."""
+        if self._db is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS dealers (
+                    id INTEGER PRIMARY KEY, dealer_key TEXT NOT NULL UNIQUE,
+                    business_name TEXT, phones TEXT, address TEXT, state TEXT,
+                    first_seen REAL NOT NULL, last_seen REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS dealer_zips (
+                    dealer_id INTEGER NOT NULL REFERENCES dealers (id), state TEXT NOT NULL, zip TEXT NOT NULL,
+                    first_seen REAL NOT NULL, last_seen REAL NOT NULL,
+                    PRIMARY KEY (dealer_id, zip)
+                );
+                CREATE TABLE IF NOT EXISTS dealer_phones (
+                    dealer_id INTEGER NOT NULL REFERENCES dealers (id), phone TEXT NOT NULL,
+                    PRIMARY KEY (dealer_id, phone)
+                );
+                CREATE INDEX IF NOT EXISTS dealers_state ON dealers (state);
+                CREATE INDEX IF NOT EXISTS dealer_zips_zip ON dealer_zips (zip);
+                CREATE INDEX IF NOT EXISTS dealer_zips_state ON dealer_zips (state, zip);
+                CREATE INDEX IF NOT EXISTS dealer_phones_phone ON dealer_phones (phone);
+            """)
+        return self._db
+
+    def upsert_batch(self, state_abbr, results):
+        """Upsert [(zip, dealer rows)] in one transaction; returns how many dealers were new."""
+        now = time.time()
+        new = 0
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")  # take the write lock up front so shard processes never race on a key
+            try:
+                for zip_code, dealers in results:
+                    for row in dealers:
+                        name, phones, address = row
+                        key = normalized_key(row)
+                        found = db.execute("SELECT id FROM dealers WHERE dealer_key = ?", (key,)).fetchone()
+                        if found:
+                            dealer_id = found[0]
+                            db.execute("UPDATE dealers SET business_name = ?, phones = ?, address = ?, last_seen = ? "
+                                       "WHERE id = ?", (name, phones, address, now, dealer_id))
+                        else:
+                            dealer_id = db.execute("""
+                                INSERT INTO dealers (dealer_key, business_name, phones, address, state, first_seen, last_seen)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                            """, (key, name, phones, address, address_state(address, state_abbr), now, now)).lastrowid
+                            new += 1
+                        db.execute("""
+                            INSERT INTO dealer_zips (dealer_id, state, zip, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT (dealer_id, zip) DO UPDATE SET last_seen = excluded.last_seen
+                        """, (dealer_id, state_abbr, zip_code, now, now))
+                        db.executemany("INSERT OR IGNORE INTO dealer_phones (dealer_id, phone) VALUES (?, ?)",
+                                       [(dealer_id, p) for p in (normalize_phone(ph) for ph in split_phones(phones)) if p])
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return new
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return self._conn().execute(sql, params).fetchall()
+
+    def dealers(self, state_abbr=None):
+        """[business name, phones, address, state, zip count] of every distinct dealer.
+
+        With state_abbr, the dealers found from that state's ZIPs (dealer_zips.state, the same grouping
+        as a per-ZIP report) and how many of its ZIPs found each; the state column is still the address's.
+        """
+        sql = """
+            SELECT d.business_name, d.phones, d.address, d.state, COUNT(z.zip)
+            FROM dealers d LEFT JOIN dealer_zips z ON z.dealer_id = d.id
+        """
+        if state_abbr:
+            return self.query(sql + " WHERE z.state = ? GROUP BY d.id ORDER BY d.id", (state_abbr,))
+        return self.query(sql + " GROUP BY d.id ORDER BY d.id")
+
+    def dealers_for_zip(self, zip_code):
+        return self.query("""
+            SELECT d.business_name, d.phones, d.address FROM dealer_zips z JOIN dealers d ON d.id = z.dealer_id
+            WHERE z.zip = ? ORDER BY d.id
+        """, (zip_code,))
+
+    def dealers_with_phone(self, phone):
+        return self.query("""
+            SELECT d.business_name, d.phones, d.address FROM dealer_phones p JOIN dealers d ON d.id = p.dealer_id
+            WHERE p.phone = ?
+        """, (normalize_phone(phone),))
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,207 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from webdriver_manager.chrome import ChromeDriverManager
+
+# psutil is optional; without it the RSS check is skipped and drivers are
+# only recycled by page count or failed health checks.
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# ----------------------
+# CONFIG
+# ----------------------
+MAX_PAGES_PER_DRIVER = 200  # recycle a browser after this many pages
+MAX_RSS_MB = 1500           # recycle a browser once chrome + children use more than this
+
+# ----------------------
+# CHROMEDRIVER PATH (installed once per process)
+# ----------------------
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+def get_chromedriver_path():
+    """Return the chromedriver binary path, running ChromeDriverManager().install() only once."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
+# ----------------------
+# HEALTH / MEMORY
+# ----------------------
+def is_driver_healthy(driver):
+    """Cheap round trip to check the browser session is still alive."""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+def get_driver_rss_mb(driver):
+    """Resident memory of chromedriver and every chrome process under it, in MB (None if unknown)."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        proc = psutil.Process(driver.service.process.pid)
+        rss = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return rss / (1024 * 1024)
+    except Exception:
+        return None
+
+# ----------------------
+# DRIVER POOL
+# ----------------------
+class DriverPool:
+    """Long-lived browsers checked out per fetch, recycled after N pages or when RSS grows too high.
+
+    acquire() lends the calling thread an idle browser (starting one if none is free) and
+    release() hands it back, so a run never has more browsers than fetches in flight at once.
+    max_drivers is an optional callable (e.g. the adaptive worker limit): a browser released
+    while the pool holds more than that many is quit instead of kept idle.
+    """
+
+    def __init__(self, driver_factory, max_pages=MAX_PAGES_PER_DRIVER, max_rss_mb=MAX_RSS_MB, max_drivers=None):
+        self.driver_factory = driver_factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.max_drivers = max_drivers
+        self._local = threading.local()   # the driver checked out by the calling thread
+        self._lock = threading.Lock()
+        self._drivers = set()
+        self._idle = []
+        self._pages = {}   # driver → pages served
+        self.created = 0
+        self.recycled = 0
+
+    def _needs_recycle(self, driver):
+        if self._pages.get(driver, 0) >= self.max_pages:
+            return "page limit"
+        if self.max_rss_mb:
+            rss = get_driver_rss_mb(driver)
+            if rss is not None and rss > self.max_rss_mb:
+                return f"RSS {rss:.0f} MB"
+        if not is_driver_healthy(driver):
+            return "failed health check"
+        return None
+
+    def _forget(self, driver):
+        with self._lock:
+            self._drivers.discard(driver)
+            self._pages.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Check out a driver for the calling thread (the one it already holds, else an idle or new one)."""
+        driver = getattr(self._local, "driver", None)
+        while driver is None:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self.driver_factory()
+                with self._lock:
+                    self._drivers.add(driver)
+                    self._pages[driver] = 0
+                    self.created += 1
+                break
+            reason = self._needs_recycle(driver)
+            if reason:
+                print(f"♻️ Recycling driver ({reason}) in {threading.current_thread().name}")
+                self._forget(driver)
+                with self._lock:
+                    self.recycled += 1
+                driver = None
+        self._local.driver = driver
+        with self._lock:
+            self._pages[driver] = self._pages.get(driver, 0) + 1
+        return driver
+
+    def release(self):
+        """Return the calling thread's driver to the pool, or quit it if the pool is over max_drivers."""
+        driver = getattr(self._local, "driver", None)
+        self._local.driver = None
+        if driver is None:
+            return
+        limit = self.max_drivers() if self.max_drivers else None
+        with self._lock:
+            if limit is None or len(self._drivers) <= limit:
+                self._idle.append(driver)
+                return
+        self._forget(driver)
+
+    def discard(self):
+        """Quit the calling thread's driver (e.g. after it crashed); the next acquire() starts a fresh one."""
+        driver = getattr(self._local, "driver", None)
+        self._local.driver = None
+        if driver is not None:
+            self._forget(driver)
+
+    def close_all(self):
+        """Quit every driver still owned by the pool (call once all workers have finished)."""
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+            self._idle.clear()
+            self._pages.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+# ----------------------
+# BENCHMARK: pooled vs. fresh browser per ZIP
+# ----------------------
+def _benchmark(zip_codes, threads, use_pool):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    def factory():
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if use_pool:
+            service = Service(get_chromedriver_path())
+        else:
+            service = Service(ChromeDriverManager().install())
+        return webdriver.Chrome(service=service, options=options)
+
+    pool = DriverPool(factory)
+
+    def fetch(zip_code):
+        url = f"https://www.cars.com/dealers/buy/?page=1&page_size=200&zip={zip_code}"
+        driver = pool.acquire() if use_pool else factory()
+        try:
+            driver.get(url)
+        finally:
+            if use_pool:
+                pool.release()
+            else:
+                driver.quit()
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(fetch, zip_codes))
+    pool.close_all()
+    return len(zip_codes) / (time.time() - start) * 60
+
+if __name__ == "__main__":
+    # Usage: python driver_pool.py 35004 35005 35006 ...  (page loads only, no parsing)
+    sample = sys.argv[1:] or ["35004", "35005", "35006", "35007", "35010", "35014", "35016", "35019"]
+    for label, use_pool in (("without pool", False), ("with pool", True)):
+        rate = _benchmark(sample, threads=4, use_pool=use_pool)
+        print(f"⚡ {label}: {rate:.1f} ZIPs/min over {len(sample)} ZIPs")
@@ -0,0 +1,184 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dealer_cards import parse_search_page, dealers_from_driver, count_from_driver, paginate, search_url, PAGE_SIZE
+from driver_pool import DriverPool, is_driver_healthy
+from page_ready import wait_for_results, READY_TIMEOUT
+from tab_backend import TabBackend
+from page_cache import get_page_cache, rendered_key, CacheMiss
+from rate_limiter import wait_for_slot
+from retry_policy import EmptyPage, classify
+
+# ----------------------
+# CONFIG
+# ----------------------
+FETCH_BACKENDS = ("auto", "http", "selenium")  # auto = HTTP first, Selenium when no dealer cards came back
+HTTP_TIMEOUT = 20       # seconds per HTTP request
+HTTP_POOL_SIZE = 32     # keep-alive connections kept open to cars.com
+PAGE_WORKERS = 4        # extra result pages of one dense ZIP fetched in parallel over HTTP
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+
+# ----------------------
+# BACKENDS
+# ----------------------
+# Every backend exposes close() and
+# fetch_dealers(zip_code, fresh=False) -> {"dealers": rows, "backend": name, "ready_sec": seconds, "pages": pages fetched}
+# fresh=True skips cached pages (refresh re-checks must see the live site); PAGE_CACHE=only still reads the cache.
+
+class HttpBackend:
+    """Plain HTTP GET on a shared keep-alive session; parses the returned HTML."""
+    name = "http"
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _get(self, url):
+        wait_for_slot(url)
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def _load_page(self, zip_code, page, fresh=False):
+        url = search_url(zip_code, page)
+        cache = get_page_cache()
+        html = cache.get(url) if not fresh or cache.offline else None
+        if html is not None:
+            return parse_search_page(html)
+        if cache.offline:
+            raise CacheMiss(f"not in cache: {url}")
+        html = self._get(url)
+        rows, total = parse_search_page(html)
+        if rows:  # a card-less body may only render in a browser, so it must not stand in for that page
+            cache.put(url, html)
+        return rows, total
+
+    def fetch_dealers(self, zip_code, fresh=False):
+        start = time.time()
+        dealers, pages = paginate(lambda page: self._load_page(zip_code, page, fresh), workers=PAGE_WORKERS)
+        return {"dealers": dealers, "backend": self.name, "ready_sec": round(time.time() - start, 2), "pages": pages}
+
+    def close(self):
+        self.session.close()
+
+class SeleniumBackend:
+    """Headless Chrome; with use_pool each ZIP borrows a browser from a DriverPool and returns it after."""
+    name = "selenium"
+
+    def __init__(self, driver_factory, use_pool=True, ready_timeout=READY_TIMEOUT, extract_mode="script",
+                 max_browsers=None):
+        self.driver_factory = driver_factory
+        self.use_pool = use_pool
+        self.ready_timeout = ready_timeout
+        self.extract_mode = extract_mode
+        self.pool = DriverPool(driver_factory, max_drivers=max_browsers)
+
+    def fetch_dealers(self, zip_code, fresh=False):
+        cache = get_page_cache()
+        drivers = []  # the browser is only started on the first cache miss
+        ready_times = []
+
+        def load_page(page):
+            url = search_url(zip_code, page)
+            html = cache.get(rendered_key(url)) if not fresh or cache.offline else None
+            if html is not None:
+                ready_times.append(0.0)
+                return parse_search_page(html)
+            if cache.offline:
+                raise CacheMiss(f"not in cache: {rendered_key(url)}")
+            if not drivers:
+                drivers.append(self.pool.acquire() if self.use_pool else self.driver_factory())
+            driver = drivers[0]
+            wait_for_slot(url)
+            driver.get(url)
+            ready_state, ready_sec = wait_for_results(driver, self.ready_timeout)
+            ready_times.append(ready_sec)
+            if ready_state == "timeout":
+                raise EmptyPage(f"no dealer cards or empty-result marker after {ready_sec}s: {url}")
+            rows = dealers_from_driver(driver, self.extract_mode)
+            total = count_from_driver(driver) if page == 1 and len(rows) >= PAGE_SIZE else None
+            if cache.enabled:
+                cache.put(rendered_key(url), driver.page_source)  # only for later cache hits / PAGE_CACHE=only
+            return rows, total
+
+        try:
+            # Extra pages reuse this ZIP's browser one after another
+            dealers, pages = paginate(load_page)
+        except Exception as e:
+            # Only a crashed or blocked browser is replaced; a slow page doesn't cost a Chrome restart
+            if self.use_pool and drivers and (classify(e) in ("driver", "blocked") or not is_driver_healthy(drivers[0])):
+                self.pool.discard()
+            raise
+        finally:
+            if self.use_pool and drivers:
+                self.pool.release()  # no-op if it was just discarded
+            elif drivers:
+                try:
+                    drivers[0].quit()
+                except:
+                    pass
+        return {"dealers": dealers, "backend": self.name, "ready_sec": ready_times[0], "pages": pages}
+
+    def close(self):
+        self.pool.close_all()
+
+class AutoBackend:
+    """Try HTTP first; fall back to Selenium only when the HTTP page had no dealer cards."""
+    name = "auto"
+
+    def __init__(self, http, selenium):
+        self.http = http
+        self.selenium = selenium
+
+    def fetch_dealers(self, zip_code, fresh=False):
+        try:
+            result = self.http.fetch_dealers(zip_code, fresh)
+            if result["dealers"]:
+                return result
+        except Exception:
+            pass  # blocked / timed out over HTTP → let the browser try
+        return self.selenium.fetch_dealers(zip_code, fresh)
+
+    def close(self):
+        self.http.close()
+        self.selenium.close()
+
+def build_backend(name, driver_factory, use_driver_pool=True, ready_timeout=READY_TIMEOUT, tabs=0, tab_setup=None,
+                  extract_mode="script", max_browsers=None):
+    """Create the fetch backend selected for this run ("auto", "http" or "selenium").
+
+    With tabs > 0 the browser side is a single Chrome driving that many tabs (TabBackend)
+    instead of pooled browsers. extract_mode picks how cards are read from the browser (see
+    dealer_cards.dealers_from_driver). max_browsers is an optional callable capping how many
+    pooled browsers are kept, e.g. the current worker limit.
+    """
+    def browser():
+        if tabs:
+            return TabBackend(driver_factory, tabs=tabs, ready_timeout=ready_timeout, tab_setup=tab_setup,
+                              extract_mode=extract_mode)
+        return SeleniumBackend(driver_factory, use_pool=use_driver_pool, ready_timeout=ready_timeout,
+                               extract_mode=extract_mode, max_browsers=max_browsers)
+
+    if name == "http":
+        return HttpBackend()
+    if name == "selenium":
+        return browser()
+    if name == "auto":
+        return AutoBackend(HttpBackend(), browser())
+    raise ValueError(f"Unknown fetch backend: {name!r} (expected one of {FETCH_BACKENDS})")
+
+def browser_fallback(backend):
+    """The browser part of a backend (None for plain HTTP), for engines that do their own HTTP fetching."""
+    if isinstance(backend, AutoBackend):
+        return backend.selenium
+    if isinstance(backend, HttpBackend):
+        return None
+    return backend
@@ -1,8 +1,15 @@
 import os
 import pandas as pd
+from result_manifest import load_manifest, zip_from_csv_name
+from dealer_cards import CSV_HEADER, dealer_fingerprint
+from output_sinks import read_dealers
+from append_log import StateLog
 
 # Source folder containing all CSVs
 source_folder = r"USA/AZ"
+source_format = "csv"   # "csv" (per-ZIP files in source_folder), "parquet" (the scraper's USA/_parquet sink)
+                        # or "log" (the per-state append log in source_folder)
+state_abbr = os.path.basename(os.path.normpath(source_folder))
 
 # Destination folder for merged CSV and report
 dest_folder = r'USA\merge\AZ'
@@ -13,9 +20,16 @@ merged_file = os.path.join(dest_folder, "AZ_merged.csv")
 report_file = os.path.join(dest_folder, "AZ_merge_report.csv")
 
 # List all CSV files in source folder
-csv_files = [f for f in os.listdir(source_folder) if f.endswith(".csv")]
+csv_files = [f for f in os.listdir(source_folder) if f.endswith(".csv") and not f.startswith("_")]
 
-if not csv_files:
+# ZIP → fingerprint manifest written by the scraper: a file whose result was already read is skipped
+manifest = load_manifest(source_folder)
+fingerprint_by_file = {os.path.basename(e["file"]): e["fingerprint"] for e in manifest.values()}
+references = sum(1 for e in manifest.values() if zip_from_csv_name(state_abbr, os.path.basename(e["file"])) != e["zip"])
+seen_fingerprints = set()
+skipped_duplicates = 0
+
+if source_format == "csv" and not csv_files:
     print("No CSV files found in the source folder!")
     exit()
 
@@ -31,7 +45,42 @@ report_data = []
 
 # Read and merge CSVs
 df_list = []
+if source_format in ("parquet", "log"):
+    # One group of rows per ZIP; a ZIP with the same dealers as an earlier one is skipped like a referenced CSV
+    if source_format == "parquet":
+        dealers = read_dealers(state_abbr)  # each ZIP's latest scrape only (like the log's last index line)
+        zip_groups = ((zip_code, group.to_dict("records")) for zip_code, group in dealers.groupby("zip", sort=True))
+    else:
+        zip_groups = StateLog(source_folder).iter_latest()
+    for zip_code, rows in zip_groups:
+        df = pd.DataFrame([
+            # Parquet rows have a phones list; append-log rows come back with write_csv's columns
+            [r["business_name"], "; ".join(r["phones"]) if len(r["phones"]) else "N/A", r["address"]] if "phones" in r
+            else [r[CSV_HEADER[0]], r[CSV_HEADER[1]], r[CSV_HEADER[2]]]
+            for r in rows
+        ], columns=CSV_HEADER)
+        fingerprint = dealer_fingerprint(df.values.tolist())
+        if fingerprint in seen_fingerprints:
+            skipped_duplicates += 1
+            continue
+        seen_fingerprints.add(fingerprint)
+        with_phone = int(df[CSV_HEADER[1]].apply(has_phone).sum())
+        report_data.append({
+            "file_name": f"{state_abbr}_{zip_code}",
+            "rows": len(df),
+            "with_phone": with_phone,
+            "without_phone": len(df) - with_phone
+        })
+        df_list.append(df)
+    csv_files = []
+
 for file in csv_files:
+    fingerprint = fingerprint_by_file.get(file)
+    if fingerprint is not None:
+        if fingerprint in seen_fingerprints:
+            skipped_duplicates += 1
+            continue
+        seen_fingerprints.add(fingerprint)
     file_path = os.path.join(source_folder, file)
     df = pd.read_csv(file_path)
     row_count = len(df)
@@ -46,6 +95,10 @@ for file in csv_files:
     })
     df_list.append(df)
 
+if not df_list:
+    print(f"No dealer rows found for {state_abbr}!")
+    exit()
+
 # Merge all CSVs
 merged_df = pd.concat(df_list, ignore_index=True)
 
@@ -71,3 +124,7 @@ report_df.to_csv(report_file, index=False, encoding="utf-8")
 
 print(f"✅ Merged CSV saved at: {merged_file}")
 print(f"✅ Merge report saved at: {report_file}")
+if source_format in ("parquet", "log"):
+    print(f"🔗 {skipped_duplicates} ZIPs with an already-merged dealer list skipped")
+elif manifest:
+    print(f"🔗 {references} ZIPs stored as references, {skipped_duplicates} duplicate CSVs skipped")
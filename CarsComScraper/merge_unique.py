@@ -1,8 +1,11 @@
 import os
 import pandas as pd
+from dealer_store import DealerStore, STORE_COLUMNS
 
 # Source folder containing all CSVs
 source_folder = r"USA\AZ"
+source_format = "csv"   # "csv" (per-ZIP files in source_folder) or "sqlite" (the scraper's deduplicated dealer store)
+state_abbr = os.path.basename(os.path.normpath(source_folder.replace("\\", "/")))
 
 # Destination folder for unique merge and report
 dest_folder = r"USA\merge_unique\AZ"
@@ -13,7 +16,25 @@ merged_file = os.path.join(dest_folder, "AZ_merged_unique.csv")
 report_file = os.path.join(dest_folder, "AZ_merge_report_unique.csv")
 
 # List all CSV files in source folder
-csv_files = [f for f in os.listdir(source_folder) if f.endswith(".csv")]
+csv_files = [f for f in os.listdir(source_folder) if f.endswith(".csv") and not f.startswith("_")] if source_format == "csv" else []
+
+if source_format == "sqlite":
+    # Dealers were already deduplicated when they were stored: no CSVs to read or merge
+    store = DealerStore()
+    merged_df = pd.DataFrame(store.dealers(state_abbr), columns=STORE_COLUMNS)
+    per_zip = store.query("SELECT zip, COUNT(*), SUM(d.phones != 'N/A') FROM dealer_zips z "
+                          "JOIN dealers d ON d.id = z.dealer_id WHERE z.state = ? GROUP BY zip ORDER BY zip",
+                          (state_abbr,))
+    report_data = [{"file_name": f"{state_abbr}_{zip_code}", "rows": rows, "with_phone": with_phone,
+                    "without_phone": rows - with_phone} for zip_code, rows, with_phone in per_zip]
+    with_phone = int((merged_df["Phone(s)"] != "N/A").sum())
+    report_data.append({"file_name": "TOTAL", "rows": len(merged_df), "with_phone": with_phone,
+                        "without_phone": len(merged_df) - with_phone})
+    merged_df.to_csv(merged_file, index=False, encoding="utf-8")
+    pd.DataFrame(report_data).to_csv(report_file, index=False, encoding="utf-8")
+    print(f"✅ {len(merged_df)} unique dealers from the dealer store saved at: {merged_file}")
+    print(f"✅ Merge report saved at: {report_file}")
+    exit()
 
 if not csv_files:
     print("No CSV files found in the source folder!")
@@ -0,0 +1,151 @@
+import csv
+import os
+import threading
+import time
+from collections import OrderedDict
+from dealer_cards import CSV_HEADER
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# ----------------------
+# CONFIG
+# ----------------------
+OUTPUT_SINKS = os.environ.get("OUTPUT_SINKS", "csv")  # any comma-separated mix of SINK_NAMES, e.g. "csv,sqlite"
+SINK_NAMES = ("csv", "parquet", "sqlite", "log")
+PARQUET_ROOT = "USA/_parquet"   # hive layout: PARQUET_ROOT/state=<ST>/part-*.parquet
+REMEMBERED_RESULTS = 2000       # recent fingerprints kept so bisect-inferred ZIPs get their source's rows
+
+def parse_sinks(value=OUTPUT_SINKS):
+    """Set of sink names from a "csv,parquet"-style setting."""
+    sinks = {name.strip().lower() for name in value.split(",") if name.strip()}
+    unknown = sinks - set(SINK_NAMES)
+    if unknown or not sinks:
+        raise ValueError(f"Unknown output sink(s): {value!r} (expected a comma-separated list of {SINK_NAMES})")
+    return sinks
+
+def write_csv(path, dealers):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(dealers)
+
+def split_phones(phone_str):
+    """"a; b" → ["a", "b"]; the "N/A" placeholder → []."""
+    if not phone_str or phone_str == "N/A":
+        return []
+    return [ph.strip() for ph in phone_str.split(";") if ph.strip()]
+
+class RecentResults:
+    """fingerprint → dealer rows of the last `size` results, so bisect-inferred ZIPs can be written in full."""
+
+    def __init__(self, size=REMEMBERED_RESULTS):
+        self.size = size
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, fingerprint, dealers):
+        with self._lock:
+            self._rows[fingerprint] = dealers
+            self._rows.move_to_end(fingerprint)
+            while len(self._rows) > self.size:
+                self._rows.popitem(last=False)
+
+    def rows_for(self, fingerprint):
+        """Dealer rows of a recent result with this fingerprint (None if forgotten)."""
+        with self._lock:
+            return self._rows.get(fingerprint)
+
+# ----------------------
+# PARQUET
+# ----------------------
+DEALER_SCHEMA = pa.schema([
+    ("zip", pa.string()),
+    ("scraped_at", pa.timestamp("s", tz="UTC")),
+    ("business_name", pa.string()),
+    ("phones", pa.list_(pa.string())),
+    ("address", pa.string()),
+]) if PYARROW_AVAILABLE else None
+
+class ParquetSink:
+    """Dealer rows as Parquet under PARQUET_ROOT/state=<ST>/, one row per dealer per ZIP.
+
+    Every write_batch() is its own part file (written to a hidden temp name, then renamed), so a
+    row is on disk before the journal marks its ZIP done. A ZIP scraped with no dealers gets one
+    marker row (null business_name), so its scrape time still supersedes older rows. compact() merges the part files this
+    process wrote into one, so concurrent shards of the same state never touch each other's files.
+    """
+
+    def __init__(self, root=PARQUET_ROOT):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("The parquet sink needs pyarrow (pip install pyarrow)")
+        self.root = root
+        self.parts = {}   # state_abbr → part files written by this process
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def partition_dir(self, state_abbr):
+        return os.path.join(self.root, f"state={state_abbr}")
+
+    def _new_path(self, state_abbr, suffix):
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        return os.path.join(self.partition_dir(state_abbr), f"part-{int(time.time())}-{os.getpid()}-{seq:05d}{suffix}.parquet")
+
+    def _write_table(self, table, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")  # hidden from readers
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def write_batch(self, state_abbr, results):
+        """Write [(zip, dealers)] as one part file; returns its path (None if there were no results)."""
+        now = int(time.time())
+        columns = {name: [] for name in DEALER_SCHEMA.names}
+        for zip_code, dealers in results:
+            for name, phones, address in dealers or [(None, "N/A", None)]:  # marker row for an empty result
+                columns["zip"].append(zip_code)
+                columns["scraped_at"].append(now)
+                columns["business_name"].append(name)
+                columns["phones"].append(split_phones(phones))
+                columns["address"].append(address)
+        if not columns["zip"]:
+            return None
+        path = self._new_path(state_abbr, "")
+        self._write_table(pa.table(columns, schema=DEALER_SCHEMA), path)
+        self.parts.setdefault(state_abbr, []).append(path)
+        return path
+
+    def compact(self, state_abbr):
+        """Merge this process's part files for the state into one file; returns its path."""
+        parts = self.parts.pop(state_abbr, [])
+        if len(parts) < 2:
+            return parts[0] if parts else None
+        path = self._new_path(state_abbr, "-merged")
+        self._write_table(pa.concat_tables(pq.read_table(p, schema=DEALER_SCHEMA) for p in parts), path)
+        for p in parts:
+            os.remove(p)
+        return path
+
+def read_dealers(state_abbr=None, root=PARQUET_ROOT, latest=True):
+    """Parquet dealer rows (one state's, or every state's with a state column) as a pandas DataFrame.
+
+    With latest, only each ZIP's most recent scrape is kept (a re-scraped ZIP has rows in several
+    part files) and empty-result marker rows are dropped; otherwise every row, markers included.
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Reading the parquet sink needs pyarrow (pip install pyarrow)")
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    table = dataset.to_table(filter=ds.field("state") == state_abbr) if state_abbr else dataset.to_table()
+    df = table.to_pandas()
+    if not latest:
+        return df
+    keys = ["state", "zip"] if "state" in df.columns else ["zip"]
+    df = df[df["scraped_at"] == df.groupby(keys)["scraped_at"].transform("max")]
+    return df[df["business_name"].notna()]
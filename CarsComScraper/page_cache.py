@@ -0,0 +1,160 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# ----------------------
+# CONFIG
+# ----------------------
+CACHE_DIR = os.environ.get("PAGE_CACHE_DIR", ".page_cache")
+CACHE_MODE = os.environ.get("PAGE_CACHE", "on")  # "off", "on" (read + write) or "only" (offline: never fetch)
+CACHE_MODES = ("off", "on", "only")
+CACHE_TTL = 7 * 24 * 3600          # seconds a cached page counts as fresh (ignored in "only" mode)
+CACHE_MAX_BYTES = 5 * 1024 ** 3    # compressed size kept on disk before least-recently-used pages are evicted
+
+class CacheMiss(Exception):
+    """Raised in "only" mode when a page isn't in the cache."""
+
+def rendered_key(url):
+    """Cache key for a browser-rendered copy of url, kept apart from the raw HTTP body of the same URL."""
+    return f"{url}#rendered"
+
+class PageCache:
+    """Compressed page bodies on disk, keyed by URL.
+
+    Bodies are stored once per content hash (blobs/ab/<sha256>.gz), so ZIPs that return the same
+    page share a file; a SQLite index maps URL → blob with fetch and last-access times.
+    Safe to share between threads; each process opens its own instance.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, mode=CACHE_MODE, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode!r} (expected one of {CACHE_MODES})")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = None
+        self.pid = os.getpid()
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @property
+    def offline(self):
+        return self.mode == "only"
+
+    def _conn(self):
+        """Open the index on first use (so processes that never touch the cache create nothing). Caller holds the lock."""
+        if self._db is None:
+            os.makedirs(os.path.join(self.cache_dir, "blobs"), exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite"), timeout=30,
+                                       check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY, digest TEXT NOT NULL,
+                    fetched_at REAL NOT NULL, accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+            """)
+        return self._db
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], f"{digest}.gz")
+
+    def get(self, url):
+        """Cached body of url, or None if missing, expired or the cache is off."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT digest, fetched_at FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            digest, fetched_at = row
+            if not self.offline and time.time() - fetched_at > self.ttl:
+                return None
+            db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+        try:
+            with gzip.open(self._blob_path(digest), "rt", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None  # blob evicted by another process
+
+    def put(self, url, body):
+        if not self.enabled or body is None:
+            return
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute("INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?)", (digest, os.path.getsize(path)))
+            db.execute("INSERT OR REPLACE INTO pages (url, digest, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                       (url, digest, now, now))
+            db.commit()
+            self._evict(db)
+
+    def _evict(self, db):
+        """Drop least-recently-used pages until the blobs fit in max_bytes (down to 90%). Caller holds the lock."""
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        while total > target:
+            urls = db.execute("SELECT url FROM pages ORDER BY accessed_at LIMIT 200").fetchall()
+            if not urls:
+                break
+            db.executemany("DELETE FROM pages WHERE url = ?", urls)
+            orphans = db.execute(
+                "SELECT digest, size FROM blobs WHERE digest NOT IN (SELECT digest FROM pages)").fetchall()
+            for digest, size in orphans:
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+                total -= size
+            db.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d, _ in orphans])
+            db.commit()
+
+    def fetch(self, url, loader):
+        """Cached body of url, else loader() (stored for next time). Raises CacheMiss in "only" mode."""
+        body = self.get(url)
+        if body is not None:
+            return body
+        if self.offline:
+            raise CacheMiss(f"not in cache: {url}")
+        body = loader()
+        self.put(url, body)
+        return body
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_page_cache():
+    """The process-wide cache configured by CACHE_DIR / CACHE_MODE (a fresh one after a fork)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared.pid != os.getpid():
+            _shared = PageCache()
+        return _shared
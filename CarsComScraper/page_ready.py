@@ -0,0 +1,52 @@
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from dealer_cards import DEALER_CARD_SELECTOR
+
+# ----------------------
+# CONFIG
+# ----------------------
+READY_TIMEOUT = 15     # ceiling (seconds) before giving up on a page
+POLL_INTERVAL = 0.2    # how often the page is checked
+
+# Markers shown when a ZIP has no dealers. Extend these if cars.com changes its empty-state markup.
+EMPTY_RESULT_SELECTORS = [
+    ".dealer-search-no-results",
+    ".sds-notification--no-results",
+]
+EMPTY_RESULT_PATTERN = r"no dealers (were )?found|\b0 dealers\b|no results found"
+
+# One script per poll: returns "cards", "empty" or null.
+# A page flagged by mark_stale() (the previous ZIP, still shown while the next one loads) never counts as ready.
+_READY_SCRIPT = """
+const cardSelector = arguments[0], emptySelectors = arguments[1], emptyPattern = arguments[2];
+if (document.documentElement.dataset.scraperStale) return null;
+if (document.querySelector(cardSelector)) return "cards";
+for (const sel of emptySelectors) {
+    if (document.querySelector(sel)) return "empty";
+}
+if (document.readyState === "complete" && document.body &&
+    new RegExp(emptyPattern, "i").test(document.body.innerText)) return "empty";
+return null;
+"""
+
+def page_state(driver):
+    """Single readiness check: "cards", "empty" or None if the page isn't ready yet."""
+    return driver.execute_script(_READY_SCRIPT, DEALER_CARD_SELECTOR, EMPTY_RESULT_SELECTORS, EMPTY_RESULT_PATTERN)
+
+def mark_stale(driver):
+    """Flag the current document so page_state() ignores it until a new page replaces it."""
+    driver.execute_script("document.documentElement.dataset.scraperStale = '1';")
+
+def wait_for_results(driver, timeout=READY_TIMEOUT):
+    """Block until dealer cards or the empty-result marker appear.
+
+    Returns (state, seconds) where state is "cards", "empty" or "timeout".
+    A timeout is not raised; the caller parses whatever has rendered.
+    """
+    start = time.time()
+    try:
+        state = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(page_state)
+    except TimeoutException:
+        state = "timeout"
+    return state, round(time.time() - start, 2)
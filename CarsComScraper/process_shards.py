@@ -0,0 +1,104 @@
+import time
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Manager
+from tqdm import tqdm
+from rate_limiter import create_shared_state, install_shared_state
+
+# ----------------------
+# CONFIG
+# ----------------------
+PROCESS_COUNT = 4       # shard processes (each with its own worker threads and browsers)
+SHARD_MAX_ZIPS = 2000   # states bigger than this are split on 3-digit ZIP prefixes
+
+def make_shards(state_jobs, max_zips=SHARD_MAX_ZIPS):
+    """Split [(state_abbr, zip_codes)] into shards of about max_zips ZIPs, never splitting a 3-digit prefix."""
+    shards = []
+    for state_abbr, zip_codes in state_jobs:
+        by_prefix = defaultdict(list)
+        for z in zip_codes:
+            by_prefix[z.strip()[:3]].append(z)
+        current = []
+        for zips in by_prefix.values():
+            if current and len(current) + len(zips) > max_zips:
+                shards.append((state_abbr, current))
+                current = []
+            current.extend(zips)
+        if current:
+            shards.append((state_abbr, current))
+    return shards
+
+class QueueProgress:
+    """Stands in for a tqdm bar inside a shard process and forwards update(n) to the parent's bar."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def update(self, n=1):
+        self.queue.put(n)
+
+    def add_yield(self, state_abbr, records):
+        """Add a scraped ZIP's dealer records to the state's running total shown on the parent's bar."""
+        self.queue.put(("yield", state_abbr, records))
+
+    def close(self):
+        pass
+
+def run_shards(state_jobs, shard_fn, processes=PROCESS_COUNT, max_zips=SHARD_MAX_ZIPS, on_state_done=None):
+    """Run shard_fn(state_abbr, zip_codes, progress) -> report rows for every shard in a process pool.
+
+    shard_fn must be a module-level function so it can be pickled. Progress from all shards feeds one
+    bar in the parent, and on_state_done(state_abbr, report_list, elapsed) is called in the parent
+    once the last shard of a state has finished.
+    """
+    shards = make_shards(state_jobs, max_zips)
+    shards_left = Counter(state_abbr for state_abbr, _ in shards)
+    state_rows = defaultdict(list)
+    start_overall = time.time()
+
+    with Manager() as manager:
+        progress_queue = manager.Queue()
+        progress_bar = tqdm(total=sum(len(z) for _, z in shards),
+                            desc=f"Scraping {len(shards_left)} states in {len(shards)} shards", ncols=100)
+
+        state_yield = Counter()
+
+        def pump_progress():
+            while True:
+                n = progress_queue.get()
+                if n is None:
+                    break
+                if isinstance(n, tuple):
+                    _, state_abbr, records = n
+                    state_yield[state_abbr] += records
+                    progress_bar.set_postfix_str(
+                        f"{sum(state_yield.values())} records, {state_abbr}: {state_yield[state_abbr]}", refresh=False)
+                    continue
+                progress_bar.update(n)
+
+        pump = threading.Thread(target=pump_progress, daemon=True)
+        pump.start()
+
+        # Every shard process paces its requests against the same per-host token buckets
+        rate_state = create_shared_state()
+        install_shared_state(rate_state)
+        with ProcessPoolExecutor(max_workers=processes, initializer=install_shared_state,
+                                 initargs=(rate_state,)) as executor:
+            futures = {
+                executor.submit(shard_fn, state_abbr, zip_codes, QueueProgress(progress_queue)): state_abbr
+                for state_abbr, zip_codes in shards
+            }
+            for future in as_completed(futures):
+                state_abbr = futures[future]
+                try:
+                    state_rows[state_abbr].extend(future.result())
+                except Exception as e:
+                    print(f"❌ A shard of {state_abbr} crashed: {e}")
+                shards_left[state_abbr] -= 1
+                if shards_left[state_abbr] == 0 and on_state_done:
+                    on_state_done(state_abbr, state_rows.pop(state_abbr), time.time() - start_overall)
+
+        progress_queue.put(None)
+        pump.join()
+        progress_bar.close()
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing as mp
+import threading
+import time
+from urllib.parse import urlsplit
+
+# ----------------------
+# CONFIG
+# ----------------------
+# Requests per second allowed per host, across every thread and shard process (0 = unlimited).
+RATE_LIMITS = {
+    "www.cars.com": 10.0,
+    "worldpopulationreview.com": 1.0,
+}
+DEFAULT_RATE = 2.0     # hosts not listed above
+BURST_SECONDS = 1.0    # a bucket holds this many seconds of tokens (at least one)
+
+class TokenBucket:
+    """Token bucket that hands out reservations: wait()/wait_async() sleep only as long as needed.
+
+    state is a 2-slot array [tokens, last_refill] with a get_lock(); a multiprocessing.Array
+    makes the bucket shared by every process that was given the same array.
+    """
+
+    def __init__(self, rate, state=None):
+        self.rate = rate
+        self.capacity = max(1.0, rate * BURST_SECONDS)
+        self.state = state if state is not None else _LocalState(self.capacity)
+
+    def reserve(self):
+        """Take one token (possibly going into debt) and return the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self.state.get_lock():
+            now = time.time()
+            tokens = min(self.capacity, self.state[0] + (now - self.state[1]) * self.rate)
+            tokens -= 1
+            self.state[0] = tokens
+            self.state[1] = now
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def wait(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+class _LocalState(list):
+    """Thread-shared bucket state with the same interface as multiprocessing.Array."""
+
+    def __init__(self, capacity):
+        super().__init__([capacity, time.time()])
+        self._lock = threading.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def rate_for(host):
+    return RATE_LIMITS.get(host, DEFAULT_RATE)
+
+def bucket_for(url):
+    """The bucket of url's host (created process-local on first use unless shared state was installed)."""
+    host = urlsplit(url).hostname or url
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(rate_for(host))
+        return _buckets[host]
+
+def wait_for_slot(url):
+    """Block until a request to url's host is allowed; returns the seconds waited."""
+    return bucket_for(url).wait()
+
+async def wait_for_slot_async(url):
+    return await bucket_for(url).wait_async()
+
+# ----------------------
+# PROCESS SHARING
+# ----------------------
+def create_shared_state(hosts=None):
+    """Shared-memory bucket state for the configured hosts; pass it to install_shared_state() in every worker."""
+    hosts = RATE_LIMITS if hosts is None else hosts
+    shared = {}
+    for host in hosts:
+        capacity = max(1.0, rate_for(host) * BURST_SECONDS)
+        shared[host] = mp.Array("d", [capacity, time.time()])
+    return shared
+
+def install_shared_state(shared):
+    """Process-pool initializer: make this process's buckets use the parent's shared counters."""
+    with _buckets_lock:
+        for host, state in shared.items():
+            _buckets[host] = TokenBucket(rate_for(host), state)
@@ -0,0 +1,83 @@
+import os
+import time
+from result_manifest import read_manifest, zip_from_csv_name
+
+# ----------------------
+# CONFIG
+# ----------------------
+REFRESH_BUDGET = 500            # already-scraped ZIPs re-crawled per state per cycle
+MIN_REFRESH_AGE = 24 * 3600     # never re-check a ZIP sooner than this (seconds)
+
+class ZipHistory:
+    """What the manifest says about one ZIP: latest fingerprint, how often it was checked and changed."""
+    __slots__ = ("fingerprint", "checks", "changes", "last_checked", "last_changed")
+
+    def __init__(self):
+        self.fingerprint = None
+        self.checks = 0
+        self.changes = 0
+        self.last_checked = 0
+        self.last_changed = 0
+
+    def observe(self, fingerprint, at):
+        if self.checks and fingerprint != self.fingerprint:
+            self.changes += 1
+            self.last_changed = at
+        self.fingerprint = fingerprint
+        self.checks += 1
+        self.last_checked = at
+
+    def change_rate(self):
+        """Share of re-checks that found a different dealer list, smoothed so new ZIPs aren't 0 or 1."""
+        return (self.changes + 1) / (self.checks + 1)
+
+    def priority(self, now):
+        """Expected changes since the last check: change rate × days since checked."""
+        age = now - self.last_checked
+        if age < MIN_REFRESH_AGE:
+            return 0.0
+        return self.change_rate() * age / 86400
+
+def load_history(folder_path):
+    """{zip: ZipHistory} replayed from the state's append-only manifest (one line per scrape)."""
+    history = {}
+    for entry in read_manifest(folder_path):
+        history.setdefault(entry["zip"], ZipHistory()).observe(entry["fingerprint"], entry.get("at", 0))
+    return history
+
+def untracked_history(folder_path, zip_codes):
+    """{zip: ZipHistory} for ZIPs with a CSV but no manifest entry (scraped before the manifest existed).
+
+    Each counts as checked once, when its file was last written, so the oldest files come up first.
+    """
+    state_abbr = os.path.basename(os.path.normpath(folder_path))
+    wanted = set(zip_codes)
+    history = {}
+    if not os.path.isdir(folder_path):
+        return history
+    for file_name in os.listdir(folder_path):
+        zip_code = zip_from_csv_name(state_abbr, file_name)
+        if zip_code not in wanted:
+            continue
+        at = os.path.getmtime(os.path.join(folder_path, file_name))
+        if zip_code not in history or at > history[zip_code].last_checked:
+            history[zip_code] = ZipHistory()
+            history[zip_code].observe(None, at)
+    return history
+
+def pick_refresh(folder_path, zip_codes, budget=REFRESH_BUDGET, now=None):
+    """The already-scraped ZIPs (out of zip_codes) to re-crawl this cycle, most likely to have changed first."""
+    now = time.time() if now is None else now
+    history = load_history(folder_path)
+    history.update(untracked_history(folder_path, [z for z in zip_codes if z not in history]))
+    ranked = sorted(
+        ((history[z].priority(now), z) for z in zip_codes if z in history),
+        reverse=True,
+    )
+    return [z for priority, z in ranked[:budget] if priority > 0]
+
+def summarize(folder_path):
+    """(ZIPs tracked, ZIPs that ever changed, total re-checks) for the refresh log line."""
+    history = load_history(folder_path)
+    return (len(history), sum(1 for h in history.values() if h.changes),
+            sum(h.checks - 1 for h in history.values()))
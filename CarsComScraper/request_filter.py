@@ -0,0 +1,83 @@
+from fnmatch import fnmatch
+
+# ----------------------
+# CONFIG
+# ----------------------
+# Resource types blocked in the scraping browser. Dealer cards are plain DOM, so none of these are needed.
+BLOCKED_RESOURCE_TYPES = ["image", "font", "stylesheet", "media"]
+
+# Analytics / ads / tag-manager hosts (Network.setBlockedURLs wildcard patterns)
+BLOCKED_HOSTS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*googleadservices.com*",
+    "*facebook.net*",
+    "*connect.facebook.com*",
+    "*hotjar.com*",
+    "*tiqcdn.com*",
+    "*adobedtm.com*",
+    "*omtrdc.net*",
+    "*demdex.net*",
+    "*scorecardresearch.com*",
+    "*quantserve.com*",
+    "*criteo.com*",
+    "*criteo.net*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    "*amazon-adsystem.com*",
+    "*adsrvr.org*",
+    "*bat.bing.com*",
+    "*clarity.ms*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+    "*optimizely.com*",
+]
+
+# Resource types or patterns to let through even though they are listed above
+# (e.g. ["stylesheet"] or ["*tiqcdn.com*"]).
+ALLOWED = []
+
+EXTENSIONS_BY_TYPE = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheet": ["css"],
+    "media": ["mp4", "webm", "m3u8", "ts", "mp3", "ogg", "mov"],
+}
+
+def blocked_url_patterns(resource_types=None, hosts=None, allowed=None):
+    """Build the Network.setBlockedURLs pattern list from the deny lists minus the allow list."""
+    resource_types = BLOCKED_RESOURCE_TYPES if resource_types is None else resource_types
+    hosts = BLOCKED_HOSTS if hosts is None else hosts
+    allowed = ALLOWED if allowed is None else allowed
+
+    patterns = []
+    for resource_type in resource_types:
+        if resource_type in allowed:
+            continue
+        for ext in EXTENSIONS_BY_TYPE.get(resource_type, []):
+            patterns.append(f"*.{ext}")
+            patterns.append(f"*.{ext}?*")
+    patterns.extend(hosts)
+    return [p for p in patterns if not any(p == a or fnmatch(p, a) for a in allowed)]
+
+def apply_blocking_prefs(options, resource_types=None, allowed=None):
+    """Chrome content settings that stop images from loading before any page is opened."""
+    resource_types = BLOCKED_RESOURCE_TYPES if resource_types is None else resource_types
+    allowed = ALLOWED if allowed is None else allowed
+    if "image" in resource_types and "image" not in allowed:
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.images": 2,
+        })
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--mute-audio")
+    return options
+
+def enable_request_blocking(driver, patterns=None):
+    """Block the configured URL patterns in the driver's current tab via CDP."""
+    patterns = blocked_url_patterns() if patterns is None else patterns
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return driver
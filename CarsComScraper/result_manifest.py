@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# ----------------------
+# CONFIG
+# ----------------------
+MANIFEST_NAME = "_manifest.jsonl"   # one per state folder, next to the ZIP CSVs
+
+def manifest_path(folder_path):
+    return os.path.join(folder_path, MANIFEST_NAME)
+
+def zip_from_csv_name(state_abbr, file_name):
+    """ZIP of an <ST>_<zip>.csv or <ST>_<zip>_<fp8>.csv result file, else None."""
+    if not (file_name.startswith(f"{state_abbr}_") and file_name.endswith(".csv")):
+        return None
+    zip_code = file_name[len(state_abbr) + 1:-4].split("_")[0]
+    return zip_code if zip_code.isdigit() else None
+
+def read_manifest(folder_path):
+    """Every manifest entry in the order it was written (a ZIP appears once per time it was scraped)."""
+    path = manifest_path(folder_path)
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+
+def load_manifest(folder_path):
+    """{zip: {"zip", "fingerprint", "file", "records", "at"}} from a state folder's manifest (later lines win)."""
+    return {entry["zip"]: entry for entry in read_manifest(folder_path)}
+
+class ResultManifest:
+    """Append-only zip → fingerprint → CSV map for one state folder.
+
+    The first ZIP with a given dealer fingerprint gets its own CSV (the canonical file);
+    later ZIPs with the same fingerprint are only recorded here as references to it.
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.entries = {}
+        self.canonical = {}              # fingerprint → file holding that result
+        self._users = defaultdict(set)   # file → ZIPs whose latest entry points at it
+        for entry in read_manifest(folder_path):
+            self._apply(entry)
+        self._lock = threading.Lock()
+
+    def _apply(self, entry):
+        zip_code, fingerprint, file = entry["zip"], entry["fingerprint"], entry["file"]
+        previous = self.entries.get(zip_code)
+        if previous is not None:
+            self._users[previous["file"]].discard(zip_code)
+        self.entries[zip_code] = entry
+        self._users[file].add(zip_code)
+        if previous is not None and not self._users[previous["file"]]:
+            # Nothing points at the old file any more (it gets deleted), so new ZIPs must not reference it
+            for old_fp in [fp for fp, f in self.canonical.items() if f == previous["file"]]:
+                del self.canonical[old_fp]
+        # A file rewritten with a new result no longer holds its old fingerprint
+        for old_fp in [fp for fp, f in self.canonical.items() if f == file and fp != fingerprint]:
+            del self.canonical[old_fp]
+        self.canonical.setdefault(fingerprint, file)
+
+    def canonical_file(self, fingerprint):
+        return self.canonical.get(fingerprint)
+
+    def shared_by_others(self, file, zip_code):
+        """True if another ZIP's entry points at file (so it must not be overwritten with a new result)."""
+        with self._lock:
+            return bool(self._users.get(file, set()) - {zip_code})
+
+    def add(self, zip_code, fingerprint, file, records):
+        entry = {"zip": zip_code, "fingerprint": fingerprint, "file": file, "records": records,
+                 "at": round(time.time())}
+        with self._lock:
+            os.makedirs(self.folder_path, exist_ok=True)
+            with open(manifest_path(self.folder_path), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._apply(entry)
+        return entry
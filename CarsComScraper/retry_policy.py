@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import random
+import socket
+import threading
+import time
+from collections import deque
+
+# ----------------------
+# CONFIG
+# ----------------------
+# kind → (retry?, base backoff seconds). Backoff doubles per attempt, capped at MAX_BACKOFF, with ±50% jitter.
+RETRY_RULES = {
+    "timeout": (True, 2.0),      # page or request took too long
+    "empty": (True, 2.0),        # browser page never showed cards nor the "no dealers" marker
+    "network": (True, 2.0),      # connection reset / DNS / refused
+    "server": (True, 5.0),       # HTTP 5xx
+    "blocked": (True, 30.0),     # HTTP 403 / 429 or a bot wall
+    "driver": (True, 1.0),       # browser crashed or the session is gone (a fresh browser is used)
+    "cache_miss": (False, 0.0),  # PAGE_CACHE=only and the page was never downloaded
+    "error": (True, 2.0),        # anything else
+}
+MAX_BACKOFF = 120.0
+
+BREAKER_WINDOW = 50        # recent attempts the circuit breaker looks at
+BREAKER_MIN_SAMPLES = 20
+BREAKER_THRESHOLD = 0.5    # failure share that opens the circuit
+BREAKER_COOLDOWN = 60.0    # seconds all workers pause once it opens
+
+class EmptyPage(Exception):
+    """A browser page timed out without showing dealer cards or the empty-result marker."""
+
+def classify(exc):
+    """Failure kind of an exception raised while fetching a ZIP (a key of RETRY_RULES)."""
+    name = type(exc).__name__
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    message = str(exc).lower()
+    if name == "CacheMiss":
+        return "cache_miss"
+    if isinstance(exc, EmptyPage):
+        return "empty"
+    if status in (403, 429) or "captcha" in message or "access denied" in message:
+        return "blocked"
+    if status is not None and status >= 500:
+        return "server"
+    if isinstance(exc, (TimeoutError, socket.timeout)) or "timeout" in name.lower() or "timed out" in message:
+        return "timeout"
+    if name in ("InvalidSessionIdException", "NoSuchWindowException") or any(
+            marker in message for marker in ("invalid session id", "chrome not reachable", "disconnected",
+                                             "session deleted", "target window already closed")):
+        return "driver"
+    if isinstance(exc, ConnectionError) or "connect" in name.lower() or "network" in name.lower():
+        return "network"
+    return "error"
+
+def is_retryable(kind):
+    return RETRY_RULES.get(kind, RETRY_RULES["error"])[0]
+
+def backoff(kind, attempt):
+    """Seconds to wait before attempt + 1 after `attempt` failed with `kind`."""
+    base = RETRY_RULES.get(kind, RETRY_RULES["error"])[1]
+    return min(MAX_BACKOFF, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+# ----------------------
+# RETRY QUEUE
+# ----------------------
+class RetryQueue:
+    """Work queue where failed items go to the back, and only once their backoff has passed.
+
+    get() blocks while nothing is due but items are still in flight (they may come back as retries)
+    and returns None once everything is finished. Every get() must be followed by done() or retry().
+    """
+
+    def __init__(self, items):
+        self._ready = deque(items)
+        self._delayed = []   # heap of (due_time, seq, item)
+        self._seq = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._ready) + len(self._delayed)
+
+    def get(self):
+        with self._cond:
+            while True:
+                now = time.time()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    self._in_flight += 1
+                    return self._ready.popleft()
+                if not self._delayed and not self._in_flight:
+                    return None
+                self._cond.wait(self._delayed[0][0] - now if self._delayed else None)
+
+    def done(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def retry(self, item, delay):
+        with self._cond:
+            self._in_flight -= 1
+            self._seq += 1
+            heapq.heappush(self._delayed, (time.time() + delay, self._seq, item))
+            self._cond.notify_all()
+
+# ----------------------
+# CIRCUIT BREAKER
+# ----------------------
+class CircuitBreaker:
+    """Pauses every worker for BREAKER_COOLDOWN once the recent failure rate passes BREAKER_THRESHOLD."""
+
+    def __init__(self, window=BREAKER_WINDOW, min_samples=BREAKER_MIN_SAMPLES, threshold=BREAKER_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.trips = 0
+        self._results = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, ok):
+        with self._lock:
+            self._results.append(ok)
+            if time.time() < self.open_until or len(self._results) < self.min_samples:
+                return
+            failure_rate = self._results.count(False) / len(self._results)
+            if failure_rate >= self.threshold:
+                self.open_until = time.time() + self.cooldown
+                self.trips += 1
+                self._results.clear()  # judge the site afresh after the pause
+                print(f"🛑 Circuit open: {failure_rate:.0%} of recent attempts failed, "
+                      f"pausing all workers for {self.cooldown:.0f}s")
+
+    def remaining(self):
+        return max(0.0, self.open_until - time.time())
+
+    def wait(self):
+        """Block while the circuit is open."""
+        while (delay := self.remaining()) > 0:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        while (delay := self.remaining()) > 0:
+            await asyncio.sleep(delay)
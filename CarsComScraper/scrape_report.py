@@ -0,0 +1,47 @@
+import csv
+import os
+from datetime import datetime
+
+# Columns of the per-state scrape report. Missing values are left blank.
+REPORT_FIELDS = ["zip", "records", "file", "time_sec", "ready_sec", "backend", "pages", "workers", "status", "attempts"]
+# Columns of the concurrency log: one row per AIMDController decision (see AIMDController.history).
+CONCURRENCY_FIELDS = ["elapsed_sec", "workers", "p95_sec", "error_rate"]
+
+def write_state_report(state_abbr, report_list, overall_elapsed, total_file="-"):
+    """Write <STATE>_scrape_report_<timestamp>.csv with one row per ZIP plus a TOTAL row."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = f"{state_abbr}_scrape_report_{timestamp}.csv"
+    with open(report_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in report_list:
+            writer.writerow(row)
+        ready_times = [r["ready_sec"] for r in report_list if r.get("ready_sec") is not None]
+        writer.writerow({
+            "zip": "TOTAL",
+            "records": sum(r['records'] for r in report_list),
+            "file": total_file,
+            "time_sec": round(overall_elapsed, 2),
+            "ready_sec": round(sum(ready_times) / len(ready_times), 2) if ready_times else "-",
+            "backend": "-",
+            "pages": sum(r.get("pages") or 0 for r in report_list),
+            "workers": max((r["workers"] for r in report_list if r.get("workers")), default="-"),
+            "status": "completed",
+            "attempts": "-"
+        })
+    return report_file
+
+def write_concurrency_log(state_abbr, history):
+    """Write <STATE>_concurrency_<timestamp>_<pid>.csv with the worker limit after every controller decision.
+
+    The pid keeps shards of one state that finish in the same second apart. Returns None if there were no decisions.
+    """
+    if not history:
+        return None
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = f"{state_abbr}_concurrency_{timestamp}_{os.getpid()}.csv"
+    with open(log_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CONCURRENCY_FIELDS)
+        writer.writerows(history)
+    return log_file
@@ -7,13 +7,15 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import logging
-import random
 import re
 import concurrent.futures
 import threading
 import os
 import zipfile
 from tqdm import tqdm
+from request_filter import apply_blocking_prefs, enable_request_blocking
+from page_cache import get_page_cache
+from rate_limiter import wait_for_slot
 
 # Configure logging first
 logging.basicConfig(
@@ -76,7 +78,7 @@ def initialize_driver():
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-images")  # Disable images for faster loading
+    apply_blocking_prefs(options)  # Block images, fonts, CSS, media and trackers (see request_filter.py)
     options.add_argument("--disable-gpu")  # Disable GPU for headless mode
     options.add_argument("--log-level=3")  # Reduce Chrome logging
     if FAKE_USER_AGENT_AVAILABLE:
@@ -88,6 +90,7 @@ def initialize_driver():
     for attempt in range(max_retries):
         try:
             driver = webdriver.Chrome(options=options)
+            enable_request_blocking(driver)
             logger.info(f"WebDriver initialized successfully (Thread: {threading.current_thread().name})")
             return driver
         except Exception as e:
@@ -97,12 +100,22 @@ def initialize_driver():
     return None
 
 def scrape_inventory_page(driver, inventory_url, max_retries=3):
-    """Attempt to scrape inventory page with retry logic."""
+    """Attempt to scrape inventory page with retry logic (served from the page cache when fresh)."""
+    cache = get_page_cache()
+    html = cache.get(inventory_url)
+    if html is not None:
+        return BeautifulSoup(html, "html.parser")
+    if cache.offline:
+        logger.warning(f"Inventory page {inventory_url} not in cache (cache-only mode)")
+        return None
     for attempt in range(max_retries):
         try:
+            wait_for_slot(inventory_url)
             driver.get(inventory_url)
             WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            inventory_soup = BeautifulSoup(driver.page_source, "html.parser")
+            html = driver.page_source
+            cache.put(inventory_url, html)
+            inventory_soup = BeautifulSoup(html, "html.parser")
             return inventory_soup
         except Exception as e:
             logger.error(f"Inventory page {inventory_url} attempt {attempt+1}/{max_retries} failed: {e} (Thread: {threading.current_thread().name})")
@@ -159,8 +172,9 @@ def scrape_dealer(driver, dealer, state, page):
 
 def scrape_state(state, pages_range=(1, 11)):
     """Function to scrape dealers for a single state with progress bar."""
-    driver = initialize_driver()
-    if not driver:
+    cache = get_page_cache()
+    driver = None if cache.offline else initialize_driver()  # cache-only mode re-parses without a browser
+    if not driver and not cache.offline:
         logger.error(f"Skipping state {state} due to WebDriver initialization failure")
         return []
     
@@ -173,9 +187,18 @@ def scrape_state(state, pages_range=(1, 11)):
             logger.info(f"Scraping: {url} (Thread: {threading.current_thread().name})")
             
             try:
-                driver.get(url)
-                WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, ".dealer-card-content")))
-                soup = BeautifulSoup(driver.page_source, "html.parser")
+                html = cache.get(url)
+                if html is None:
+                    if cache.offline:
+                        logger.warning(f"Page {page} for state {state} not in cache (cache-only mode)")
+                        pbar.update(1)
+                        continue
+                    wait_for_slot(url)
+                    driver.get(url)
+                    WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, ".dealer-card-content")))
+                    html = driver.page_source
+                    cache.put(url, html)
+                soup = BeautifulSoup(html, "html.parser")
                 dealer_cards = soup.select(".dealer-card-content")
 
                 logger.info(f"Found {len(dealer_cards)} dealers on page {page} for state {state} (Thread: {threading.current_thread().name})")
@@ -199,7 +222,6 @@ def scrape_state(state, pages_range=(1, 11)):
                     end_index = record_count
                     save_state_dealers(state, page_dealers, start_index, end_index)
 
-                time.sleep(random.uniform(1, 3))
                 pbar.update(1)
 
             except Exception as e:
@@ -216,7 +238,8 @@ def scrape_state(state, pages_range=(1, 11)):
     zip_state_files(state)
     
     try:
-        driver.quit()
+        if driver:
+            driver.quit()
         logger.info(f"WebDriver closed for state {state} (Thread: {threading.current_thread().name})")
     except Exception as e:
         logger.error(f"Error closing WebDriver for state {state}: {e}")
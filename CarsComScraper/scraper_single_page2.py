@@ -3,19 +3,33 @@ import csv
 import os
 import threading
 import json
-from queue import Queue
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from tqdm import tqdm
-from datetime import datetime
+from driver_pool import get_chromedriver_path
+from request_filter import apply_blocking_prefs, enable_request_blocking
+from tab_backend import apply_tab_options
+from fetch_backend import build_backend, browser_fallback
+from async_engine import run_zip_queue_async
+from scrape_report import write_state_report, write_concurrency_log
+from concurrency import AIMDController
+from retry_policy import CircuitBreaker, RetryQueue, classify, is_retryable, backoff
 
 # ----------------------
 # CONFIG
 # ----------------------
-THREAD_COUNT = 10  # concurrent threads
+THREAD_COUNT = 10  # concurrent threads to start with
+ADAPTIVE_WORKERS = True  # AIMD: add a worker while healthy, halve them on errors / slow p95 (see concurrency.py)
+MAX_THREADS = 32         # ceiling for the adaptive worker count
 MAX_RETRIES = 3   # retry attempts per ZIP
+USE_DRIVER_POOL = True  # reuse pooled browsers (at most one per worker slot) instead of a new Chrome per ZIP
+BLOCK_ASSETS = True     # block images, fonts, CSS, media and trackers (lists in request_filter.py)
+USE_TABS = False        # one Chrome driving THREAD_COUNT tabs instead of one Chrome per thread
+READY_TIMEOUT = 15      # max seconds to wait for dealer cards / empty-result marker
+EXTRACT_MODE = "script" # "script" (one execute_script), "html" (page_source + offline parser) or "webdriver"
+FETCH_BACKEND = os.environ.get("FETCH_BACKEND", "auto")  # "auto" (HTTP, Selenium fallback), "http" or "selenium"
+ENGINE = "threads"      # "threads" (THREAD_COUNT workers) or "async" (event loop, ASYNC_CONCURRENCY in flight)
+ASYNC_CONCURRENCY = 1000
 
 ZIP_FILE = input("Enter path to ZIP JSON file (e.g., zipcode/AK.json): ").strip()
 
@@ -30,107 +44,116 @@ def get_driver():
     options.add_argument("--disable-software-rasterizer")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    if BLOCK_ASSETS:
+        apply_blocking_prefs(options)
+    if USE_TABS:
+        apply_tab_options(options)
+    driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=options)
     driver.set_window_size(1920, 1080)
+    if BLOCK_ASSETS:
+        enable_request_blocking(driver)
     return driver
 
+backend = build_backend(
+    FETCH_BACKEND, get_driver, use_driver_pool=USE_DRIVER_POOL, ready_timeout=READY_TIMEOUT,
+    tabs=THREAD_COUNT if USE_TABS else 0, tab_setup=enable_request_blocking if BLOCK_ASSETS else None,
+    extract_mode=EXTRACT_MODE,
+    max_browsers=lambda: controller.limit,  # pooled browsers beyond the current worker limit are quit
+)
+
 # ----------------------
-# SCRAPER FUNCTION
+# RESULT HANDLING
 # ----------------------
-def scrape_zip(zip_code, state_abbr, progress_lock, report_list, progress_bar):
-    start_time = time.time()
-    url = f"https://www.cars.com/dealers/buy/?page=1&page_size=200&zip={zip_code}"
-
-    for attempt in range(1, MAX_RETRIES + 1):
-        driver = None
-        try:
-            driver = get_driver()
-            driver.get(url)
-            time.sleep(5)
-
-            all_dealers = []
-            dealers = driver.find_elements(By.CSS_SELECTOR, "div.sds-container.dealer-card")
+def record_result(zip_code, state_abbr, all_dealers, row, progress_lock, report_list, progress_bar):
+    """Save a ZIP's CSV and add its report row (all_dealers is None on failure)."""
+    if all_dealers is not None:
+        # Save CSV
+        folder_path = f"USA/{state_abbr}"
+        os.makedirs(folder_path, exist_ok=True)
+        output_file = os.path.join(folder_path, f"{state_abbr}_{zip_code}.csv")
+        with open(output_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Business Name", "Phone(s)", "Address"])
+            writer.writerows(all_dealers)
+        row["file"] = output_file
+    else:
+        row["file"] = "ERROR"
 
-            for dealer in dealers:
-                try:
-                    name = dealer.find_element(By.CSS_SELECTOR, "h2.dealer-heading").text.strip()
-                except:
-                    name = "N/A"
-                try:
-                    address = dealer.find_element(By.CSS_SELECTOR, "div.dealer-address a.sds-link--ext").text.strip()
-                except:
-                    address = "N/A"
-                phones = []
-                try:
-                    phone_elements = dealer.find_elements(By.CSS_SELECTOR, "a.phone-number, .desktop-phone-number")
-                    for p in phone_elements:
-                        ph = p.text.strip()
-                        if ph and ph not in phones:
-                            phones.append(ph)
-                except:
-                    pass
-                phone_str = "; ".join(phones) if phones else "N/A"
-                all_dealers.append([name, phone_str, address])
+    with progress_lock:
+        report_list.append(row)
+        if all_dealers is None:
+            print(f"[{zip_code}] ❌ Error after {row['attempts']} attempts: {row['status']}")
+        else:
+            completed_zipcodes.append(zip_code)
+            remaining = total_zipcodes - len(report_list)
+            print(f"[{zip_code}] ✅ {len(all_dealers)} records | Time: {row['time_sec']}s | Remaining: {remaining}")
+        progress_bar.update(1)
 
-            # Save CSV
-            folder_path = f"USA/{state_abbr}"
-            os.makedirs(folder_path, exist_ok=True)
-            output_file = os.path.join(folder_path, f"{state_abbr}_{zip_code}.csv")
-            with open(output_file, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Business Name", "Phone(s)", "Address"])
-                writer.writerows(all_dealers)
-
-            elapsed = time.time() - start_time
-            with progress_lock:
-                completed_zipcodes.append(zip_code)
-                report_list.append({
-                    "zip": zip_code,
-                    "records": len(all_dealers),
-                    "file": output_file,
-                    "time_sec": round(elapsed, 2),
-                    "status": "success",
-                    "attempts": attempt
-                })
-                remaining = zip_queue.qsize()
-                print(f"[{zip_code}] ✅ {len(all_dealers)} records | Time: {round(elapsed,2)}s | Remaining: {remaining}")
-                progress_bar.update(1)
+# ----------------------
+# SCRAPER FUNCTION
+# ----------------------
+def attempt_zip(zip_code, attempt, start_time, state_abbr, progress_lock, report_list, progress_bar):
+    """One fetch attempt for a ZIP; records it on success or final failure.
 
-            return  # ✅ success → exit function
+    Returns the backoff before the next attempt, or None when the ZIP is done.
+    """
+    breaker.wait()  # every worker pauses while the circuit is open
+    attempt_start = time.time()
+    try:
+        result = backend.fetch_dealers(zip_code)
+    except Exception as e:
+        kind = classify(e)
+        controller.record(False, time.time() - attempt_start)
+        breaker.record(False)
+        if attempt < MAX_RETRIES and is_retryable(kind):
+            return backoff(kind, attempt)
+        record_result(zip_code, state_abbr, None, {
+            "zip": zip_code,
+            "records": 0,
+            "time_sec": round(time.time() - start_time, 2),
+            "workers": controller.limit,
+            "status": f"failed ({kind}: {e})",
+            "attempts": attempt
+        }, progress_lock, report_list, progress_bar)
+        return None
 
-        except Exception as e:
-            if attempt == MAX_RETRIES:
-                elapsed = time.time() - start_time
-                with progress_lock:
-                    report_list.append({
-                        "zip": zip_code,
-                        "records": 0,
-                        "file": "ERROR",
-                        "time_sec": round(elapsed, 2),
-                        "status": f"failed ({e})",
-                        "attempts": attempt
-                    })
-                    print(f"[{zip_code}] ❌ Error after {attempt} attempts: {e}")
-                    progress_bar.update(1)
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+    all_dealers = result["dealers"]
+    controller.record(True, time.time() - attempt_start)
+    breaker.record(True)
+    record_result(zip_code, state_abbr, all_dealers, {
+        "zip": zip_code,
+        "records": len(all_dealers),
+        "time_sec": round(time.time() - start_time, 2),
+        "ready_sec": result["ready_sec"],
+        "backend": result["backend"],
+        "pages": result["pages"],
+        "workers": controller.limit,
+        "status": "success",
+        "attempts": attempt
+    }, progress_lock, report_list, progress_bar)
+    return None  # ✅ success
 
 # ----------------------
 # THREAD WORKER
 # ----------------------
 def scrape_worker(queue, progress_lock, state_abbr, report_list, progress_bar):
-    while not queue.empty():
-        zip_code = queue.get()
+    """Take (zip, attempt, first_start) items; a retryable failure goes to the back of the queue after its backoff."""
+    while True:
+        item = queue.get()
+        if item is None:
+            break
+        zip_code, attempt, start_time = item
+        start_time = start_time or time.time()
         try:
-            zip_code = zip_code.strip()
-            if zip_code:
-                scrape_zip(zip_code, state_abbr, progress_lock, report_list, progress_bar)
-        finally:
-            queue.task_done()
+            with controller.slot():
+                delay = attempt_zip(zip_code, attempt, start_time, state_abbr, progress_lock, report_list, progress_bar)
+        except Exception:
+            queue.done()
+            raise
+        if delay is None:
+            queue.done()
+        else:
+            queue.retry((zip_code, attempt + 1, start_time), delay)
 
 # ----------------------
 # MAIN
@@ -150,50 +173,59 @@ if __name__ == "__main__":
     state_abbr = list(zip_json.keys())[0]
     zip_codes = zip_json[state_abbr]
 
-    zip_queue = Queue()
-    for z in zip_codes:
-        zip_queue.put(z)
+    zip_queue = RetryQueue([(z.strip(), 1, None) for z in zip_codes if z.strip()])
 
     total_zipcodes = zip_queue.qsize()
     completed_zipcodes = []
     progress_lock = threading.Lock()
     report_list = []
+    breaker = CircuitBreaker()
+    if ADAPTIVE_WORKERS:
+        # Tab mode has a fixed number of tabs, so the controller can only shrink below it
+        controller = AIMDController(THREAD_COUNT, max_workers=THREAD_COUNT if USE_TABS else MAX_THREADS)
+    else:
+        controller = AIMDController(THREAD_COUNT, min_workers=THREAD_COUNT, max_workers=THREAD_COUNT)
 
     start_overall = time.time()
 
     progress_bar = tqdm(total=total_zipcodes, desc=f"Scraping {state_abbr}", ncols=100)
 
-    threads = []
-    for _ in range(min(THREAD_COUNT, zip_queue.qsize())):
-        t = threading.Thread(target=scrape_worker, args=(zip_queue, progress_lock, state_abbr, report_list, progress_bar))
-        t.start()
-        threads.append(t)
+    if ENGINE == "async":
+        # HTTP always goes first here; "auto"/"selenium" add the browser fallback for card-less pages.
+        # Parsing runs in a thread pool: this script asks for input() at import, so no spawned processes.
+        run_zip_queue_async(
+            [z.strip() for z in zip_codes if z.strip()],
+            lambda z, dealers, row: record_result(z, state_abbr, dealers, row, progress_lock, report_list, progress_bar),
+            fallback=browser_fallback(backend),
+            concurrency=ASYNC_CONCURRENCY,
+            max_retries=MAX_RETRIES,
+            parse_processes=0,
+            fallback_threads=THREAD_COUNT,
+            breaker=breaker,
+        )
+    else:
+        threads = []
+        for _ in range(min(controller.max_workers, zip_queue.qsize())):
+            t = threading.Thread(target=scrape_worker, args=(zip_queue, progress_lock, state_abbr, report_list, progress_bar))
+            t.start()
+            threads.append(t)
 
-    for t in threads:
-        t.join()
+        for t in threads:
+            t.join()
 
     progress_bar.close()
+    backend.close()
 
     overall_elapsed = time.time() - start_overall
 
     # Save report
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_file = f"{state_abbr}_scrape_report_{timestamp}.csv"
-    with open(report_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["zip", "records", "file", "time_sec", "status", "attempts"])
-        writer.writeheader()
-        for row in report_list:
-            writer.writerow(row)
-        writer.writerow({
-            "zip": "TOTAL",
-            "records": sum(r['records'] for r in report_list),
-            "file": "-",
-            "time_sec": round(overall_elapsed, 2),
-            "status": "completed",
-            "attempts": "-"
-        })
+    report_file = write_state_report(state_abbr, report_list, overall_elapsed)
 
     print(f"\n🎉 Scraping complete! Report saved → {report_file}")
+    concurrency_file = write_concurrency_log(state_abbr, controller.history)
+    if concurrency_file:
+        print(f"👷 Worker-limit changes saved → {concurrency_file}")
+    print(f"⚡ Throughput: {len(report_list) / overall_elapsed * 60:.1f} ZIPs/min (engine: {ENGINE}, backend: {FETCH_BACKEND}, browser: {'tabs' if USE_TABS else 'pool' if USE_DRIVER_POOL else 'per ZIP'})")
 
 
 
@@ -388,3 +420,6 @@ if __name__ == "__main__":
 #                          "file": "-", "time_sec": round(overall_elapsed,2)})
 #
 #     print(f"\n🎉 Scraping complete! Report saved → {report_file}")
+    concurrency_file = write_concurrency_log(state_abbr, controller.history)
+    if concurrency_file:
+        print(f"👷 Worker-limit changes saved → {concurrency_file}")
@@ -0,0 +1,151 @@
+import time
+import threading
+from queue import Queue
+from dealer_cards import dealers_from_driver, count_from_driver, paginate, parse_search_page, search_url, PAGE_SIZE
+from driver_pool import is_driver_healthy
+from page_cache import get_page_cache, rendered_key, CacheMiss
+from rate_limiter import wait_for_slot
+from retry_policy import EmptyPage
+from page_ready import page_state, mark_stale, READY_TIMEOUT, POLL_INTERVAL
+
+# ----------------------
+# CONFIG
+# ----------------------
+TABS_PER_BROWSER = 10   # one tab per worker thread
+
+# Chrome throttles timers and rendering in background tabs; every tab here is "background" but one.
+TAB_CHROME_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+def apply_tab_options(options):
+    """Chrome options for tab mode: no background throttling, and page loads that don't block the session."""
+    for arg in TAB_CHROME_ARGS:
+        options.add_argument(arg)
+    options.page_load_strategy = "none"  # otherwise chromedriver waits for each tab's load before the next command
+    return options
+
+class TabBackend:
+    """One Chrome process, one tab per worker thread.
+
+    Only the short WebDriver commands (switch tab, start navigation, poll, read the cards) are
+    serialized on the single session; the page loads themselves run in parallel across tabs.
+    Same fetch_dealers()/close() interface as the backends in fetch_backend.py.
+    """
+    name = "tabs"
+
+    def __init__(self, driver_factory, tabs=TABS_PER_BROWSER, ready_timeout=READY_TIMEOUT, tab_setup=None,
+                 extract_mode="script"):
+        self.driver_factory = driver_factory
+        self.tabs = tabs
+        self.ready_timeout = ready_timeout
+        self.extract_mode = extract_mode
+        self.tab_setup = tab_setup        # called with the driver after each new tab is opened (e.g. CDP blocking)
+        self._lock = threading.Lock()     # guards the shared WebDriver session
+        self._local = threading.local()
+        self._driver = None
+        self._generation = 0
+        self._free_tabs = Queue()
+
+    def _start_browser(self):
+        """(Re)start the browser and open its tabs. Caller holds self._lock."""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+        driver = self.driver_factory()
+        handles = [driver.current_window_handle]
+        for _ in range(self.tabs - 1):
+            driver.switch_to.new_window("tab")
+            if self.tab_setup:
+                self.tab_setup(driver)
+            handles.append(driver.current_window_handle)
+        self._driver = driver
+        self._generation += 1
+        self._free_tabs = Queue()
+        for handle in handles:
+            self._free_tabs.put(handle)
+
+    def _my_tab(self):
+        """The calling thread's tab handle (taken from the free list the first time, or after a restart)."""
+        with self._lock:
+            if self._driver is None:
+                self._start_browser()
+            generation, free_tabs = self._generation, self._free_tabs
+        if getattr(self._local, "generation", None) != generation:
+            self._local.handle = free_tabs.get()  # blocks if there are more threads than tabs
+            self._local.generation = generation
+        return self._local.handle
+
+    def _run(self, handle, fn):
+        with self._lock:
+            self._driver.switch_to.window(handle)
+            return fn(self._driver)
+
+    def _load_page(self, zip_code, page, fresh=False):
+        """Navigate this thread's tab to one results page and read it; returns (rows, total or None, ready_sec)."""
+        url = search_url(zip_code, page)
+        cache = get_page_cache()
+        html = cache.get(rendered_key(url)) if not fresh or cache.offline else None
+        if html is not None:
+            return parse_search_page(html) + (0.0,)
+        if cache.offline:
+            raise CacheMiss(f"not in cache: {rendered_key(url)}")
+        handle = self._my_tab()  # the browser is only started on the first cache miss
+        wait_for_slot(url)
+        start = time.time()
+
+        # Start navigation without waiting for the load, so other tabs can use the session meanwhile
+        def navigate(driver):
+            mark_stale(driver)
+            driver.execute_script("window.location.href = arguments[0];", url)
+        self._run(handle, navigate)
+
+        ready_state = None
+        while ready_state is None and time.time() - start < self.ready_timeout:
+            time.sleep(POLL_INTERVAL)
+            ready_state = self._run(handle, page_state)
+        ready_sec = round(time.time() - start, 2)
+        if ready_state is None:
+            raise EmptyPage(f"no dealer cards or empty-result marker after {ready_sec}s: {url}")
+
+        def read(driver):
+            rows = dealers_from_driver(driver, self.extract_mode)
+            total = count_from_driver(driver) if page == 1 and len(rows) >= PAGE_SIZE else None
+            return rows, total, driver.page_source if cache.enabled else None
+        rows, total, html = self._run(handle, read)
+        if html is not None:
+            cache.put(rendered_key(url), html)  # only for later cache hits / PAGE_CACHE=only
+        return rows, total, ready_sec
+
+    def fetch_dealers(self, zip_code, fresh=False):
+        ready_times = []
+
+        def load_page(page):
+            rows, total, ready_sec = self._load_page(zip_code, page, fresh)
+            ready_times.append(ready_sec)
+            return rows, total
+
+        try:
+            # Extra pages go through this thread's own tab one after another
+            dealers, pages = paginate(load_page)
+        except Exception:
+            with self._lock:
+                if self._driver is not None and not is_driver_healthy(self._driver):
+                    print("♻️ Browser died, restarting it with fresh tabs")
+                    self._start_browser()
+            raise
+
+        return {"dealers": dealers, "backend": self.name, "ready_sec": ready_times[0], "pages": pages}
+
+    def close(self):
+        with self._lock:
+            if self._driver is not None:
+                try:
+                    self._driver.quit()
+                except Exception:
+                    pass
+                self._driver = None
@@ -0,0 +1,60 @@
+import csv
+import glob
+import os
+from collections import defaultdict
+from result_manifest import load_manifest
+from zip_gazetteer import load_zip_density, GAZETTEER_FILE
+
+# ----------------------
+# CONFIG
+# ----------------------
+DENSITY_FILE = GAZETTEER_FILE   # ZIP table with a density (or population) column; used when it exists
+
+def prior_records(state_abbr, report_glob=None):
+    """{zip: dealers found last time} from the state's manifest, falling back to old scrape reports."""
+    records = {}
+    report_glob = report_glob or f"{state_abbr}_scrape_report_*.csv"
+    for report_file in sorted(glob.glob(report_glob)):  # oldest first, so newer reports win
+        try:
+            with open(report_file, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    if row.get("zip") != "TOTAL" and row.get("status") in ("success", "inferred"):
+                        records[row["zip"]] = int(row["records"])
+        except (OSError, KeyError, ValueError):
+            continue
+    for zip_code, entry in load_manifest(f"USA/{state_abbr}").items():
+        records[zip_code] = entry["records"]
+    return records
+
+def expected_yield(zip_codes, records, density=None):
+    """{zip: expected dealer count}.
+
+    A ZIP's own earlier count wins; otherwise the mean of its 3-digit prefix's earlier counts;
+    otherwise its density scaled by the dealers-per-density ratio of ZIPs that have both
+    (or the raw density when there are no earlier counts at all).
+    """
+    density = density or {}
+    prefix_counts = defaultdict(list)
+    for zip_code, count in records.items():
+        prefix_counts[zip_code[:3]].append(count)
+    prefix_mean = {p: sum(c) / len(c) for p, c in prefix_counts.items()}
+
+    both = [z for z in records if z in density]
+    density_sum = sum(density[z] for z in both)
+    scale = sum(records[z] for z in both) / density_sum if density_sum else 1.0
+
+    estimates = {}
+    for zip_code in zip_codes:
+        if zip_code in records:
+            estimates[zip_code] = records[zip_code]
+        elif zip_code[:3] in prefix_mean:
+            estimates[zip_code] = prefix_mean[zip_code[:3]]
+        else:
+            estimates[zip_code] = density.get(zip_code, 0.0) * scale
+    return estimates
+
+def order_by_yield(state_abbr, zip_codes, density_file=DENSITY_FILE):
+    """zip_codes sorted so the ZIPs expected to return the most dealers come first (ties keep file order)."""
+    density = load_zip_density(density_file) if density_file and os.path.exists(density_file) else {}
+    estimates = expected_yield(zip_codes, prior_records(state_abbr), density)
+    return sorted(zip_codes, key=lambda z: -estimates.get(z, 0.0))
@@ -0,0 +1,111 @@
+import heapq
+import threading
+import time
+from collections import defaultdict, deque
+from dealer_cards import dealer_fingerprint
+
+# ----------------------
+# CONFIG
+# ----------------------
+BISECT_SPAN = 16   # ZIPs between the seed endpoints scraped first (smaller = more parallel, fewer skips)
+
+class BisectScheduler:
+    """Orders a state's ZIPs so runs of neighbours with identical results are scraped only at their ends.
+
+    ZIPs are sorted numerically and every BISECT_SPAN-th ZIP (plus the last) is scraped first. Once
+    both ends of a range are done, the range is either inferred (same dealer fingerprint at both ends,
+    so every ZIP in between gets that result) or split at its middle ZIP, which is scraped next.
+    A failed ZIP never matches anything, so its neighbours are still scraped.
+
+    Thread-safe: workers call get() until it returns None, then report() after each ZIP or
+    retry() to have it handed out again once its backoff has passed.
+    """
+
+    def __init__(self, zip_codes, span=BISECT_SPAN):
+        self.zips = sorted(set(z.strip() for z in zip_codes if z.strip()))
+        self.index = {z: i for i, z in enumerate(self.zips)}
+        self.results = {}                    # index -> (fingerprint or None, record count)
+        self._ranges_at = defaultdict(list)  # index -> ranges waiting for that endpoint
+        self._ready = deque()
+        self._delayed = []                   # heap of (due_time, seq, zip) waiting out a retry backoff
+        self._tries = {}                     # zip -> (attempt, first start) of a ZIP being retried
+        self._seq = 0
+        self._outstanding = 0                # queued or handed out, not yet reported
+        self._cond = threading.Condition()
+        self.inferred = 0
+
+        n = len(self.zips)
+        seeds = sorted(set(range(0, n, max(1, span))) | ({n - 1} if n else set()))
+        for lo, hi in zip(seeds, seeds[1:]):
+            self._ranges_at[lo].append((lo, hi))
+            self._ranges_at[hi].append((lo, hi))
+        for i in seeds:
+            self._schedule(i)
+
+    def _schedule(self, i):
+        self._ready.append(self.zips[i])
+        self._outstanding += 1
+
+    def get(self):
+        """Next ZIP to scrape, blocking while others are in flight; None once the state is finished."""
+        with self._cond:
+            while True:
+                now = time.time()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    return self._ready.popleft()
+                if not self._outstanding:
+                    return None
+                self._cond.wait(self._delayed[0][0] - now if self._delayed else None)
+
+    def attempt(self, zip_code):
+        """(attempt number, first start time) of a ZIP from get(); (1, None) unless it came back through retry()."""
+        with self._cond:
+            return self._tries.pop(zip_code, (1, None))
+
+    def retry(self, zip_code, delay, attempt, start_time):
+        """Hand a failed ZIP out again after delay seconds (it stays outstanding until report())."""
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._delayed, (time.time() + delay, self._seq, zip_code))
+            self._tries[zip_code] = (attempt, start_time)
+            self._cond.notify_all()
+
+    def take_ready(self):
+        """All ZIPs scrapeable right now (for engines that run one wave at a time)."""
+        with self._cond:
+            batch = list(self._ready)
+            self._ready.clear()
+            return batch
+
+    def report(self, zip_code, dealers):
+        """Record a scraped ZIP (dealers is None if it failed).
+
+        Returns [(inferred_zip, source_zip, record_count, fingerprint)] for the ZIPs this result lets us skip.
+        """
+        inferred = []
+        with self._cond:
+            i = self.index[zip_code]
+            self._outstanding -= 1
+            fingerprint = None if dealers is None else dealer_fingerprint(dealers)
+            self.results[i] = (fingerprint, 0 if dealers is None else len(dealers))
+
+            for lo, hi in self._ranges_at.pop(i, []):
+                if lo not in self.results or hi not in self.results:
+                    continue  # the other end is still in flight
+                if hi - lo <= 1:
+                    continue
+                lo_fp, count = self.results[lo]
+                if lo_fp is not None and lo_fp == self.results[hi][0]:
+                    for j in range(lo + 1, hi):
+                        self.results[j] = (lo_fp, count)
+                        inferred.append((self.zips[j], self.zips[lo], count, lo_fp))
+                    continue
+                mid = (lo + hi) // 2
+                self._ranges_at[mid].extend([(lo, mid), (mid, hi)])
+                self._schedule(mid)
+
+            self.inferred += len(inferred)
+            self._cond.notify_all()
+        return inferred
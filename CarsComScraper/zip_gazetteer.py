@@ -0,0 +1,81 @@
+import csv
+import math
+import os
+
+# ----------------------
+# CONFIG
+# ----------------------
+# Local ZIP centroid file, one row per ZIP: zip, lat, lng, state (e.g. the free SimpleMaps uszips.csv).
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "us_zips.csv")
+
+# Accepted spellings of each column, so common gazetteer exports load without editing
+COLUMN_ALIASES = {
+    "zip": ["zip", "zipcode", "zip_code", "postal_code", "GEOID", "ZCTA5"],
+    "lat": ["lat", "latitude", "INTPTLAT"],
+    "lng": ["lng", "lon", "long", "longitude", "INTPTLONG"],
+    "state": ["state", "state_id", "state_abbr", "stusps"],
+    "density": ["density", "pop_density", "population_density"],
+    "population": ["population", "pop", "total_population"],
+}
+
+EARTH_RADIUS_MILES = 3958.8
+
+def _column(fieldnames, key):
+    names = {name.strip().lower(): name for name in fieldnames}
+    for alias in COLUMN_ALIASES[key]:
+        if alias.lower() in names:
+            return names[alias.lower()]
+    return None
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """{zip: (lat, lng, state_abbr)} from the centroid CSV. state_abbr is "" if the file has no state column."""
+    gazetteer = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = {key: _column(reader.fieldnames or [], key) for key in COLUMN_ALIASES}
+        missing = [key for key in ("zip", "lat", "lng") if columns[key] is None]
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(missing)} column (header: {reader.fieldnames})")
+        for row in reader:
+            try:
+                lat = float(row[columns["lat"]])
+                lng = float(row[columns["lng"]])
+            except (TypeError, ValueError):
+                continue
+            zip_code = row[columns["zip"]].strip().zfill(5)
+            state = row[columns["state"]].strip().upper() if columns["state"] else ""
+            gazetteer[zip_code] = (lat, lng, state)
+    return gazetteer
+
+def zips_by_state(gazetteer):
+    """{state_abbr: sorted ZIPs} from a loaded gazetteer."""
+    states = {}
+    for zip_code, (_, _, state) in gazetteer.items():
+        states.setdefault(state, []).append(zip_code)
+    return {state: sorted(zips) for state, zips in states.items()}
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance in miles."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+def build_zip_index(gazetteer):
+    """{zip: state_abbr} for every ZIP that really exists; each ZIP maps to exactly one state."""
+    return {zip_code: state for zip_code, (_, _, state) in gazetteer.items() if state}
+
+def load_zip_density(path=GAZETTEER_FILE):
+    """{zip: people per square mile} (or population if the file has no density column); {} if neither exists."""
+    density = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        zip_col = _column(reader.fieldnames or [], "zip")
+        value_col = _column(reader.fieldnames or [], "density") or _column(reader.fieldnames or [], "population")
+        if zip_col is None or value_col is None:
+            return density
+        for row in reader:
+            try:
+                density[row[zip_col].strip().zfill(5)] = float(row[value_col])
+            except (TypeError, ValueError):
+                continue
+    return density
@@ -2,10 +2,13 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import csv
-import time
 from urllib.parse import urljoin
 import os
 import re
+from collections import Counter
+from zip_gazetteer import load_gazetteer, build_zip_index, zips_by_state, GAZETTEER_FILE
+from page_cache import get_page_cache
+from rate_limiter import wait_for_slot
 
 # Map state names to abbreviations
 STATE_ABBR = {
@@ -22,6 +25,13 @@ STATE_ABBR = {
     'west-virginia': 'WV', 'wisconsin': 'WI', 'wyoming': 'WY'
 }
 
+def state_abbr_for(state):
+    """Abbreviation for a state key in either spelling ('new-hampshire' or 'new_hampshire')."""
+    key = state.lower().replace("_", "-")
+    if key == "district-of-columbia":
+        return "DC"
+    return STATE_ABBR.get(key, state[:2].upper())
+
 class USZipCodeScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -30,19 +40,25 @@ class USZipCodeScraper:
         })
         self.base_url = "https://worldpopulationreview.com"
         self.zip_data = {}
+        self.from_ranges = False  # zip_data is meant to be every ZIP (USPS ranges), not a scraped sample
 
     def get_state_list(self):
         return list(STATE_ABBR.keys())
 
+    def _get(self, url):
+        wait_for_slot(url)  # per-host pacing (RATE_LIMITS in rate_limiter.py)
+        response = self.session.get(url, timeout=10)
+        response.raise_for_status()
+        return response.text
+
     def scrape_zip_codes_method1(self):
-        """Scrape from worldpopulationreview.com"""
+        """Scrape from worldpopulationreview.com (pages come from the shared page cache when fresh)"""
+        cache = get_page_cache()
         for state in self.get_state_list():
             try:
                 print(f"Scraping zip codes for {state.title()}...")
                 url = f"{self.base_url}/us-cities/{state}"
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(cache.fetch(url, lambda: self._get(url)), 'html.parser')
                 zip_codes = []
 
                 # Extract zip codes from tables
@@ -55,7 +71,6 @@ class USZipCodeScraper:
 
                 self.zip_data[state] = sorted(list(set(zip_codes)))
                 print(f"Found {len(zip_codes)} zip codes for {state.title()}")
-                time.sleep(1)
             except Exception as e:
                 print(f"Error scraping {state}: {e}")
                 self.zip_data[state] = []
@@ -118,25 +133,92 @@ class USZipCodeScraper:
 
         for state, zip_range in zip_ranges.items():
             self.zip_data[state] = [str(i).zfill(5) for i in zip_range]
+        self.from_ranges = True
 
-    def save_to_json_per_state_abbr(self, folder="zipcode"):
-        """Save ZIP codes per state using state abbreviation as JSON object"""
-        os.makedirs(folder, exist_ok=True)
+    def filter_with_zip_index(self, gazetteer_file=GAZETTEER_FILE, complete=False):
+        """Keep only ZIPs that exist, each under the one state the gazetteer puts it in.
+
+        A real ZIP generated under the wrong state is moved to its own state. With complete=True
+        every state also gets the gazetteer ZIPs no list generated (the USPS ranges miss e.g. all
+        of MA, NH and RI). Returns {abbr: zips} plus a Counter of what was dropped or moved.
+        """
+        gazetteer = load_gazetteer(gazetteer_file)
+        zip_index = build_zip_index(gazetteer)
+        per_state = {state_abbr_for(state): [] for state in self.zip_data}
+        stats = Counter()
+        seen = set()
         for state, zip_codes in self.zip_data.items():
-            abbr = STATE_ABBR.get(state.lower(), state[:2].upper())
+            abbr = state_abbr_for(state)
+            for zip_code in zip_codes:
+                stats["generated"] += 1
+                real_state = zip_index.get(zip_code)
+                if real_state is None:
+                    stats["nonexistent"] += 1
+                elif zip_code in seen:
+                    stats["duplicate"] += 1
+                else:
+                    if real_state != abbr:
+                        stats["wrong_state"] += 1  # moved to real_state
+                    seen.add(zip_code)
+                    per_state.setdefault(real_state, []).append(zip_code)
+        if complete:
+            for abbr, zip_codes in zips_by_state(gazetteer).items():
+                if abbr not in per_state:
+                    continue
+                missing = [z for z in zip_codes if z not in seen]
+                stats["added"] += len(missing)
+                seen.update(missing)
+                per_state[abbr].extend(missing)
+        stats["kept"] = len(seen)
+        return per_state, stats
+
+    def save_to_json_per_state_abbr(self, folder="zipcode", gazetteer_file=GAZETTEER_FILE):
+        """Save ZIP codes per state using state abbreviation as JSON object.
+
+        With a local ZIP gazetteer, only real ZIPs are written, each under exactly one state.
+        A state that ends up with no ZIPs keeps its existing file.
+        """
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(gazetteer_file):
+            per_state, stats = self.filter_with_zip_index(gazetteer_file, complete=self.from_ranges)
+        else:
+            print(f"⚠️ {gazetteer_file} not found, saving ZIPs unfiltered")
+            per_state, stats = {}, None
+            for state, zip_codes in self.zip_data.items():
+                per_state.setdefault(state_abbr_for(state), []).extend(zip_codes)
+
+        for abbr, zip_codes in per_state.items():
             file_path = os.path.join(folder, f"{abbr}.json")
-            data = {abbr: zip_codes}  # JSON object with state abbreviation as key
+            if not zip_codes:
+                print(f"⚠️ No ZIP codes for {abbr}, leaving {file_path} as it is")
+                continue
+            data = {abbr: sorted(zip_codes)}  # JSON object with state abbreviation as key
             with open(file_path, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2)
             print(f"✅ Saved {len(zip_codes)} ZIP codes for {abbr} → {file_path}")
 
+        if stats:
+            dropped = stats["nonexistent"] + stats["duplicate"]
+            print(f"\n📊 ZIP index: {stats['generated']} generated, {stats['kept']} kept")
+            print(f"   ✅ {stats['kept'] - stats['wrong_state'] - stats['added']} kept in their own state, "
+                  f"{stats['wrong_state']} moved in from another state's list, {stats['added']} added from the gazetteer")
+            print(f"   ❌ {dropped} dropped: {stats['nonexistent']} don't exist, {stats['duplicate']} repeated")
+            if stats["generated"]:
+                print(f"   💰 {dropped} requests saved ({dropped / stats['generated']:.0%})")
+        return stats
+
 def main():
     scraper = USZipCodeScraper()
     print("Choose method:")
     print("1. Web scraping")
     print("2. Generate ALL zip codes from USPS ranges")
+    print("3. Plan a minimal covering set of ZIPs from the local gazetteer (us_zips.csv)")
 
-    choice = input("Enter choice (1 or 2): ").strip()
+    choice = input("Enter choice (1, 2 or 3): ").strip()
+    if choice == '3':
+        from coverage_planner import main as plan_coverage
+        plan_coverage()
+        return
     if choice == '1':
         scraper.scrape_zip_codes_method1()
     else: